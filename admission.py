@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager
+from timings import record_stage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AGENT_CONCURRENCY = int(os.getenv('AGENT_CONCURRENCY', '16'))
+CLIENT_CONCURRENCY = int(os.getenv('CLIENT_CONCURRENCY', '4'))
+ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', '64'))
+ADMISSION_TIMEOUT = float(os.getenv('ADMISSION_TIMEOUT', '10'))
+
+
+class AdmissionRejected(Exception):
+    """Raised instead of running the agent; `status` is 429 for a busy client and 503 for a busy server."""
+
+    def __init__(self, status : int, message : str, retry_after : int = 1):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits agent runs to `capacity` at a time and `per_client` per client (running plus queued).
+    Up to `queue_size` runs wait at most `timeout` seconds for a free slot; anything beyond is
+    rejected at once.
+    """
+
+    def __init__(self, capacity : int = AGENT_CONCURRENCY, per_client : int = CLIENT_CONCURRENCY,
+                 queue_size : int = ADMISSION_QUEUE_SIZE, timeout : float = ADMISSION_TIMEOUT):
+        self.capacity = capacity
+        self.per_client = per_client
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._slots = None
+        self._lock = threading.Lock()
+        self._clients = Counter()
+        self._running = 0
+        self._queued = 0
+        self._stats = Counter()
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        return self._slots
+
+    def check(self, client : str):
+        """Raise AdmissionRejected right away if `client` could not even join the queue now."""
+        with self._lock:
+            self._check_locked(client)
+
+    def _check_locked(self, client : str):
+        if self._clients[client] >= self.per_client:
+            self._stats['rejected_client_limit'] += 1
+            raise AdmissionRejected(429, 'Too many concurrent requests from this client')
+        # Counted before any await, so a simultaneous burst cannot all slip past the check.
+        if self._running + self._queued >= self.capacity + self.queue_size:
+            self._stats['rejected_queue_full'] += 1
+            raise AdmissionRejected(503, 'Server is busy, please retry shortly', retry_after=max(1, int(self.timeout)))
+
+    @asynccontextmanager
+    async def slot(self, client : str):
+        slots = self._get_slots()
+        with self._lock:
+            self._check_locked(client)
+            self._clients[client] += 1
+            self._queued += 1
+        started = time.perf_counter()
+        try:
+            try:
+                await asyncio.wait_for(slots.acquire(), self.timeout)
+            except BaseException as e:
+                with self._lock:
+                    self._queued -= 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        self._stats['rejected_timeout'] += 1
+                if isinstance(e, asyncio.TimeoutError):
+                    raise AdmissionRejected(503, 'Server is busy, please retry shortly', retry_after=max(1, int(self.timeout)))
+                raise
+            record_stage('admission_wait', time.perf_counter() - started)
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._stats['admitted'] += 1
+            try:
+                yield
+            finally:
+                slots.release()
+                with self._lock:
+                    self._running -= 1
+        finally:
+            with self._lock:
+                self._clients[client] -= 1
+                if self._clients[client] <= 0:
+                    del self._clients[client]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'running' : self._running,
+                    'queued' : self._queued,
+                    'clients' : len(self._clients),
+                    'capacity' : self.capacity,
+                    'per_client' : self.per_client,
+                    'queue_size' : self.queue_size,
+                    'admitted' : self._stats['admitted'],
+                    'rejected_client_limit' : self._stats['rejected_client_limit'],
+                    'rejected_queue_full' : self._stats['rejected_queue_full'],
+                    'rejected_timeout' : self._stats['rejected_timeout']}
+
+
+admission = AdmissionController()
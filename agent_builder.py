@@ -0,0 +1,112 @@
+"""
+Everything that needs the LangChain / Gemini stack to run the agent. Only imported once an
+agent is actually built, so a cold process can serve cached answers, routed lookups and the
+/data API without paying for these imports.
+"""
+import time
+from langchain.prompts import ChatPromptTemplate
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain_core.agents import AgentAction
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_google_genai import ChatGoogleGenerativeAI
+from functions.get_rainfalldata import get_rainfallrecharge
+from functions.get_rechargedata import get_overallrechargeData
+from functions.get_gwlossdata import get_gwlossdata
+from functions.get_blockcount_classification import get_blockcount_classification
+from functions.get_currentavailablegwdata import get_availableGWforFutureUseData
+from functions.get_overallstageofExtraction import get_overall_stage_of_extraction
+from functions.get_trenddata import get_groundwater_trend
+from functions.get_statecomparison import compare_states
+from functions.get_subregiondata import get_district_data, get_block_data
+from functions.get_stateanalytics import get_state_analytics
+from functions.get_websearch import search_web
+from timings import record_stage, TRACE
+from tool_executor import record_step, tool_slot, tool_step
+
+TOOLS = [get_overallrechargeData, get_rainfallrecharge, get_gwlossdata, get_blockcount_classification, get_availableGWforFutureUseData, get_overall_stage_of_extraction, get_groundwater_trend, compare_states, get_district_data, get_block_data, get_state_analytics, search_web]
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor whose tool calls from one agent step run concurrently, at most
+    `TOOL_CONCURRENCY` at a time per step; results keep the order the model asked for.
+    """
+
+    async def _aiter_next_step(self, *args, **kwargs):
+        actions = 0
+        # The base class gathers the step's tool runs as tasks, which inherit this step's slots.
+        with tool_step():
+            async for item in super()._aiter_next_step(*args, **kwargs):
+                if isinstance(item, AgentAction):
+                    actions += 1
+                yield item
+        if actions:
+            record_step(actions)
+
+    async def _aperform_agent_action(self, *args, **kwargs):
+        async with tool_slot():
+            return await super()._aperform_agent_action(*args, **kwargs)
+
+
+class StageTimingHandler(AsyncCallbackHandler):
+    """Records every LLM call and tool run made by the agent as a span tagged with tool and state."""
+
+    def __init__(self):
+        self._started = {}
+
+    def _start(self, run_id, tool : str = '', state : str = ''):
+        self._started[run_id] = (time.perf_counter(), tool, state)
+
+    def _end(self, stage : str, run_id):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            started, tool, state = started
+            record_stage(stage, time.perf_counter() - started, tool, state)
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id)
+
+    async def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id)
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end('llm', run_id)
+
+    async def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end('llm', run_id)
+
+    async def on_tool_start(self, serialized, input_str, *, run_id, inputs=None, **kwargs):
+        tool = (serialized or {}).get('name') or kwargs.get('name') or ''
+        self._start(run_id, tool, (inputs or {}).get('state', ''))
+
+    async def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end('tool', run_id)
+
+    async def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end('tool', run_id)
+
+
+def default_llm():
+    return ChatGoogleGenerativeAI(
+        model='gemini-2.0-flash',
+        temperature=0.8
+    )
+
+
+def build_agent_executor(system_prompt : str, llm = None) -> ParallelAgentExecutor:
+    prompt = ChatPromptTemplate.from_messages([
+        ('system', system_prompt.replace('{', '{{').replace('}', '}}')),
+        ("placeholder", "{chat_history}"),
+        ('human','{query}'),
+        ("placeholder", "{agent_scratchpad}"),
+    ])
+
+    if llm is None:
+        llm = default_llm()
+
+    agent = create_tool_calling_agent(
+        llm=llm,
+        prompt=prompt,
+        tools=TOOLS
+    )
+    return ParallelAgentExecutor(agent=agent, tools=TOOLS, verbose=TRACE)
@@ -0,0 +1,81 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from cachetools import TTLCache
+from functions.ingres_cache import data_generation
+from intent_router import find_states, YEAR
+
+ANSWER_CACHE_SIZE = int(os.getenv('ANSWER_CACHE_SIZE', '1024'))
+ANSWER_CACHE_TTL = float(os.getenv('ANSWER_CACHE_TTL', '600'))
+HISTORY_TURNS = int(os.getenv('ANSWER_CACHE_HISTORY_TURNS', '4'))
+
+_cache = TTLCache(maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL)
+_lock = threading.Lock()
+_generation = data_generation()
+_stats = {'hits' : 0, 'misses' : 0, 'stores' : 0, 'invalidations' : 0}
+
+
+def normalize_query(query : str) -> str:
+    query = re.sub(r'\s+', ' ', query.lower()).strip()
+    return query.strip(' ?!.')
+
+
+def history_fingerprint(chathistory : list[dict[str,str]] | None) -> str:
+    """Hash of the last few turns, which are the ones that can change the meaning of a follow-up."""
+    if not chathistory:
+        return ''
+    recent = [{'role' : turn.get('role'), 'content' : turn.get('content')} for turn in chathistory[-HISTORY_TURNS:]]
+    return hashlib.sha1(json.dumps(recent, sort_keys=True).encode()).hexdigest()
+
+
+def answer_key(query : str, chathistory : list[dict[str,str]] | None) -> tuple:
+    entities = (tuple(sorted(find_states(query))), tuple(sorted(set(YEAR.findall(query)))))
+    return normalize_query(query), entities, history_fingerprint(chathistory)
+
+
+def _check_generation_locked():
+    global _generation
+    current = data_generation()
+    if current != _generation:
+        _cache.clear()
+        _generation = current
+        _stats['invalidations'] += 1
+
+
+def get_cached_answer(query : str, chathistory : list[dict[str,str]] | None) -> str | None:
+    key = answer_key(query, chathistory)
+    with _lock:
+        _check_generation_locked()
+        answer = _cache.get(key)
+        _stats['hits' if answer is not None else 'misses'] += 1
+    return answer
+
+
+def store_answer(query : str, chathistory : list[dict[str,str]] | None, answer : str | None, generation : int):
+    """Cache `answer` unless the data changed since `generation` was read at the start of the request."""
+    if not answer:
+        return
+    key = answer_key(query, chathistory)
+    with _lock:
+        _check_generation_locked()
+        if generation != _generation:
+            return
+        _cache[key] = answer
+        _stats['stores'] += 1
+
+
+def get_answer_cache_stats() -> dict:
+    with _lock:
+        lookups = _stats['hits'] + _stats['misses']
+        return {**_stats,
+                'hit_rate' : _stats['hits'] / lookups if lookups else 0.0,
+                'entries' : len(_cache),
+                'max_entries' : _cache.maxsize,
+                'ttl' : ANSWER_CACHE_TTL}
+
+
+def clear_answer_cache():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,51 @@
+"""
+Measure the per-request cost removed by building the agent once per process.
+
+    python -m bench.bench_agent_startup [--iterations 50]
+
+Compares constructing the prompt, Gemini client, agent and AgentExecutor on every
+call (the old behaviour of chatbot()) against fetching the process-wide executor.
+No request is sent to Gemini; a placeholder API key is used when none is configured.
+"""
+import os
+import time
+import argparse
+import statistics
+
+os.environ.setdefault('GOOGLE_API_KEY', 'benchmark-placeholder-key')
+
+from chatbot import build_agent_executor, init_agent, get_agent_executor
+
+
+def _timed(fn, iterations : int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _report(label : str, samples : list[float]):
+    print(f"{label:<28} mean {statistics.mean(samples):9.3f} ms   p50 {statistics.median(samples):9.3f} ms   max {max(samples):9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    init_agent()
+    print(f"startup init_agent()          {(time.perf_counter() - started) * 1000:9.3f} ms (paid once per process)")
+
+    per_request = _timed(build_agent_executor, args.iterations)
+    reused = _timed(get_agent_executor, args.iterations)
+
+    _report('build per request', per_request)
+    _report('reuse process agent', reused)
+    print(f"overhead removed per request  {statistics.mean(per_request) - statistics.mean(reused):9.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
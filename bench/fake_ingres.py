@@ -0,0 +1,143 @@
+"""
+Local stand-in for the INGRES getBusinessDataForUserOpen endpoint.
+
+    python -m bench.fake_ingres [--port 8765] [--latency 0.2] [--fixtures data/snapshots]
+
+Country responses are served from recorded snapshots named `<assessment year>.json[.gz]`
+(the layout written by `python -m functions.history_store ingest`). Years without a
+recording, and state or district payloads, get deterministic synthetic responses
+(`<STATE> DISTRICT 1..8`, `<DISTRICT> BLOCK 1..10`).
+"""
+import zlib
+import gzip
+import json
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from functions.location_index import STATE_NAMES
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+
+def _four(rng : random.Random, scale : float) -> dict:
+    command = round(rng.uniform(0.2, 0.6) * scale, 2)
+    non_command = round(scale - command, 2)
+    return {'poor_quality' : round(rng.uniform(0, 0.05) * scale, 2), 'total' : round(scale, 2),
+            'command' : command, 'non_command' : non_command}
+
+
+def synthetic_response(year : str, names : list[str] = STATE_NAMES, scope : str = 'INDIA') -> list[dict]:
+    rng = random.Random(f'{year}:{scope}')
+    records = []
+    for name in names:
+        recharge = rng.uniform(5_000, 3_000_000)
+        sources = {source : {'total' : round(recharge * rng.uniform(0.01, 0.3), 2)}
+                   for source in ('agriculture', 'pipeline', 'rainfall', 'surface_irrigation', 'gw_irrigation',
+                                  'water_body', 'canal', 'sewage', 'artificial_structure')}
+        sources['total'] = {'total' : round(recharge, 2)}
+        blocks = [rng.randint(0, 60) for _ in range(4)]
+        records.append({
+            'locationName' : name,
+            'locationUUID' : f'synthetic-{zlib.crc32(f"{name}:{year}".encode()):08x}',
+            'rainfall' : _four(rng, recharge * rng.uniform(0.4, 0.8)),
+            'loss' : _four(rng, recharge * rng.uniform(0.02, 0.1)),
+            'stageOfExtraction' : _four(rng, rng.uniform(5, 170)),
+            'availabilityForFutureUse' : _four(rng, recharge * rng.uniform(0.05, 0.5)),
+            'reportSummary' : {'total' : {'BLOCK' : dict(zip(('over_exploited', 'critical', 'semi_critical', 'safe'), blocks))}},
+            'rechargeData' : sources,
+        })
+    return records
+
+
+class FakeIngresServer:
+    """Threaded HTTP server answering every POST with the snapshot for the payload's year."""
+
+    def __init__(self, host : str = '127.0.0.1', port : int = 0, latency : float = 0.0, fixtures : Path = DEFAULT_FIXTURES):
+        self.latency = latency
+        self.fixtures = Path(fixtures)
+        self.requests = 0
+        self._bodies = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    payload = {}
+                body = server.body(str(payload.get('year', '2024-2025')), payload.get('loctype', 'COUNTRY'), payload.get('locname', 'INDIA'))
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/api/gec/getBusinessDataForUserOpen'
+
+    def body(self, year : str, loctype : str = 'COUNTRY', locname : str = 'INDIA') -> bytes:
+        if loctype != 'COUNTRY':
+            key = (year, loctype, locname)
+            with self._lock:
+                if key not in self._bodies:
+                    children = [f'{locname} DISTRICT {i}' for i in range(1, 9)] if loctype == 'STATE' else [f'{locname} BLOCK {i}' for i in range(1, 11)]
+                    self._bodies[key] = json.dumps(synthetic_response(year, children, locname)).encode()
+                return self._bodies[key]
+
+        with self._lock:
+            if year not in self._bodies:
+                for path in (self.fixtures / f'{year}.json.gz', self.fixtures / f'{year}.json'):
+                    if path.exists():
+                        opener = gzip.open if path.suffix == '.gz' else open
+                        with opener(path, 'rb') as f:
+                            self._bodies[year] = f.read()
+                        break
+                else:
+                    self._bodies[year] = json.dumps(synthetic_response(year)).encode()
+            return self._bodies[year]
+
+    def start(self) -> 'FakeIngresServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before answering')
+    parser.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURES)
+    args = parser.parse_args()
+
+    server = FakeIngresServer(args.host, args.port, args.latency, args.fixtures)
+    print(f"Fake INGRES listening on {server.url}; export INGRES_API_URL={server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import time
+import asyncio
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from intent_router import find_states, find_intents
+from functions.metric_registry import METRIC_GROUPS
+
+DEFAULT_STATE = 'PUNJAB'
+DEFAULT_YEAR = 2025
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for Gemini in the agent loop.
+
+    On a new question it calls the tools the intent router would pick for every state it
+    mentions (stage of extraction when no metric is recognised, `compare_states` for
+    ranking questions, `search_web` for news questions); once tool results are in it returns a short markdown answer.
+    `latency` simulates the model's response time per call.
+    """
+
+    latency : float = 0.0
+    calls : int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted-fake'
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _respond(self, messages) -> AIMessage:
+        self.calls += 1
+        if isinstance(messages[-1], ToolMessage):
+            results = [message for message in messages if isinstance(message, ToolMessage)]
+            lines = [f"- {str(message.content)[:120]}" for message in results]
+            return AIMessage(content='### Groundwater summary\n\n' + '\n'.join(lines))
+
+        query = next((str(message.content) for message in reversed(messages) if isinstance(message, HumanMessage)), '')
+        if any(word in query.lower() for word in ('top', 'highest', 'lowest', 'rank')):
+            calls = [('compare_states', {'metrics' : ['stage_of_extraction'], 'top_n' : 5})]
+        elif any(word in query.lower() for word in ('news', 'latest', 'recent')):
+            calls = [('search_web', {'query' : query})]
+        else:
+            tools = [METRIC_GROUPS[intent['name']]['tool'] for intent in find_intents(query)] or ['get_overall_stage_of_extraction']
+            states = find_states(query) or [DEFAULT_STATE]
+            calls = [(tool, {'state' : state, 'year' : DEFAULT_YEAR}) for state in states for tool in tools]
+
+        return AIMessage(content='', tool_calls=[{'name' : name, 'args' : args, 'id' : f'call-{self.calls}-{i}'}
+                                                 for i, (name, args) in enumerate(calls)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
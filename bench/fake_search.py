@@ -0,0 +1,92 @@
+"""
+Local stand-in for the web search backend used by `search_web`.
+
+    python -m bench.fake_search [--port 8766] [--latency 0.3]
+
+Answers `GET /search?q=...&max_results=N` with deterministic news-style results for the query,
+including a duplicated link and a repeated snippet so the tool's deduplication is exercised.
+Point the app at it with `WEBSEARCH_URL=<url>`.
+"""
+import json
+import time
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def synthetic_results(query : str, count : int = 5) -> list[dict]:
+    slug = '-'.join(query.lower().split())[:60]
+    results = [{'title' : f'{query.title()} - report {i}',
+                'snippet' : f'Report {i} on {query}: groundwater levels, recharge and extraction were discussed by '
+                            f'officials, with new measures announced for the coming season. ' * 3,
+                'link' : f'https://news.example.org/{slug}/{i}'}
+               for i in range(1, count + 1)]
+    results.insert(1, dict(results[0]))
+    results.insert(3, {**results[2], 'link' : f'https://mirror.example.org/{slug}/2'})
+    return results
+
+
+class FakeSearchServer:
+    """Threaded HTTP server answering every GET with synthetic search results."""
+
+    def __init__(self, host : str = '127.0.0.1', port : int = 0, latency : float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                query = params.get('q', [''])[0]
+                count = int(params.get('max_results', ['5'])[0])
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                body = json.dumps(synthetic_results(query, count)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/search'
+
+    def start(self) -> 'FakeSearchServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before answering')
+    args = parser.parse_args()
+
+    server = FakeSearchServer(args.host, args.port, args.latency)
+    print(f"Fake search listening on {server.url}; export WEBSEARCH_URL={server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Report what importing the app costs on a cold start.
+
+    python -m bench.import_profile [--module main] [--top 20] [--json]
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter, then prints the total
+import time, the slowest top-level packages and modules by cumulative time, and whether the
+LLM stack (LangChain, Gemini) was imported. That stack should only load when the agent is built.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+HEAVY_PACKAGES = ('langchain', 'langchain_core', 'langchain_community', 'langchain_google_genai', 'google.ai', 'grpc')
+
+
+def profile_imports(module : str) -> list[dict]:
+    """One entry per imported module: name, self and cumulative microseconds, and nesting depth."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=os.getcwd())
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|', 2)
+        entries.append({'module' : name.strip(), 'self_us' : int(own), 'cumulative_us' : int(cumulative),
+                        'depth' : (len(name) - len(name.lstrip()) - 1) // 2})
+    return entries
+
+
+def summarize(entries : list[dict], top : int) -> dict:
+    packages = {}
+    for entry in entries:
+        root = entry['module'].split('.')[0]
+        packages[root] = packages.get(root, 0) + entry['self_us']
+    loaded = {entry['module'] for entry in entries}
+    return {'total_ms' : round(sum(entry['self_us'] for entry in entries) / 1000, 1),
+            'modules' : len(entries),
+            'packages' : [{'package' : name, 'ms' : round(us / 1000, 1)}
+                          for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]],
+            'slowest' : [{'module' : entry['module'], 'cumulative_ms' : round(entry['cumulative_us'] / 1000, 1)}
+                         for entry in sorted(entries, key=lambda entry: -entry['cumulative_us'])[:top]],
+            'heavy_loaded' : sorted(name for name in HEAVY_PACKAGES if name in loaded)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='main', help='Module to import, e.g. main or chatbot')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    report = {'module' : args.module, **summarize(profile_imports(args.module), args.top)}
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"import {args.module}: {report['total_ms']:.1f} ms across {report['modules']} modules")
+    print(f"\nTop packages (self time)")
+    for item in report['packages']:
+        print(f"  {item['package']:<40} {item['ms']:9.1f} ms")
+    print(f"\nSlowest modules (cumulative)")
+    for item in report['slowest']:
+        print(f"  {item['module']:<40} {item['cumulative_ms']:9.1f} ms")
+    if report['heavy_loaded']:
+        print(f"\nLLM stack imported at startup: {', '.join(report['heavy_loaded'])}")
+    else:
+        print(f"\nLLM stack not imported at startup")
+
+
+if __name__ == '__main__':
+    main()
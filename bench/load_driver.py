@@ -0,0 +1,188 @@
+"""
+Offline load benchmark for /chat.
+
+    python -m bench.load_driver [--requests 200] [--concurrency 20] [--llm-latency 0.05]
+                                [--ingres-latency 0.2] [--search-latency 0.3] [--json out.json]
+                                [--baseline old.json]
+
+By default the app runs in-process against local fake INGRES and web search servers and a
+scripted chat model, so nothing leaves the machine. `--url` drives an already running server
+instead; the per-stage breakdown is only available in-process.
+
+Reports p50/p95/p99 latency, throughput and the mean time per request spent in the LLM,
+tools, INGRES download and JSON parsing; agent overhead is the request time not
+accounted for by LLM and tool calls. With `--baseline` the run fails (exit code 1) when
+p95 latency regressed by more than `--max-regression`.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import logging
+import numpy as np
+import httpx
+
+QUERIES = [
+    'What is the stage of extraction in {state} {year}?',
+    'How many over-exploited blocks are there in {state}?',
+    'Give me the rainfall recharge of {state} for {year}',
+    'Groundwater status of {state}',
+    'Why is groundwater in {state} under stress and what can be done?',
+    'Explain the recharge sources and losses for {state}',
+    'Which states have the highest stage of extraction?',
+    'Latest news on groundwater in {state}',
+]
+STATES = ['Punjab', 'Rajasthan', 'Haryana', 'Tamil Nadu', 'Kerala', 'Maharashtra', 'UP', 'Orissa', 'Gujarat', 'Bihar']
+# Lets the driver name each simulated user in X-Client-ID (see CLIENT_ID_SECRET in main.py).
+BENCH_CLIENT_SECRET = 'bench-client-secret'
+STAGES = ['llm', 'tool', 'ingres_fetch', 'json_parse']
+
+
+def build_queries(count : int) -> list[str]:
+    queries = []
+    for i in range(count):
+        template = QUERIES[i % len(QUERIES)]
+        queries.append(template.format(state=STATES[(i // len(QUERIES)) % len(STATES)], year=2024 + i % 2))
+    return queries
+
+
+async def drive(client : httpx.AsyncClient, queries : list[str], concurrency : int, before_request=None) -> tuple[list[float], int, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i : int, query : str):
+        nonlocal errors
+        async with semaphore:
+            if before_request:
+                before_request()
+            started = time.perf_counter()
+            try:
+                # Every request is its own simulated user, so the per-client admission limit does not apply.
+                response = await client.post('/chat', json={'query' : query},
+                                             headers={'X-Client-ID' : f'bench-{i}', 'X-Client-Auth' : BENCH_CLIENT_SECRET})
+                if response.status_code != 200 or not response.json().get('success'):
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i, query) for i, query in enumerate(queries)])
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies : list[float], errors : int, elapsed : float) -> dict:
+    values = np.array(latencies) * 1000
+    return {
+        'requests' : len(latencies),
+        'errors' : errors,
+        'elapsed_s' : round(elapsed, 3),
+        'throughput_rps' : round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms' : {
+            'mean' : round(float(values.mean()), 2),
+            'p50' : round(float(np.percentile(values, 50)), 2),
+            'p95' : round(float(np.percentile(values, 95)), 2),
+            'p99' : round(float(np.percentile(values, 99)), 2),
+            'max' : round(float(values.max()), 2),
+        },
+    }
+
+
+async def run_in_process(args, queries : list[str]) -> dict:
+    from bench.fake_ingres import FakeIngresServer
+    from bench.fake_search import FakeSearchServer
+
+    server = FakeIngresServer(latency=args.ingres_latency).start()
+    search = FakeSearchServer(latency=args.search_latency).start()
+    os.environ['INGRES_API_URL'] = server.url
+    os.environ['WEBSEARCH_URL'] = search.url
+    scratch = tempfile.mkdtemp(prefix='bench-')
+    os.environ['INGRES_SNAPSHOT_DIR'] = os.path.join(scratch, 'snapshots')
+    os.environ['INGRES_LAST_GOOD_DIR'] = os.path.join(scratch, 'last_good')
+    os.environ['SESSION_DB'] = os.path.join(scratch, 'sessions.sqlite3')
+    os.environ.setdefault('GOOGLE_API_KEY', 'benchmark-placeholder-key')
+    os.environ.setdefault('AGENT_WARMUP', 'lazy')
+    os.environ['CLIENT_ID_SECRET'] = BENCH_CLIENT_SECRET
+
+    import main
+    import chatbot
+    from bench.fake_llm import ScriptedChatModel
+    from timings import get_stage_totals, reset_stages
+    from answer_cache import clear_answer_cache
+    from functions.ingres_cache import clear_cache
+
+    def before_request():
+        if args.no_answer_cache:
+            clear_answer_cache()
+        if args.cold_ingres:
+            clear_cache()
+
+    try:
+        async with main.lifespan(main.app):
+            chatbot.init_agent(ScriptedChatModel(latency=args.llm_latency))
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+                await drive(client, queries[:min(len(queries), args.concurrency)], args.concurrency, before_request)
+                reset_stages()
+                latencies, errors, elapsed = await drive(client, queries, args.concurrency, before_request)
+                stats = (await client.get('/stats')).json()
+    finally:
+        server.stop()
+        search.stop()
+
+    report = summarize(latencies, errors, elapsed)
+    totals = get_stage_totals()
+    per_request = {stage : round(totals.get(stage, {}).get('seconds', 0.0) * 1000 / len(latencies), 2) for stage in STAGES}
+    per_request['agent_overhead'] = round(max(report['latency_ms']['mean'] - per_request['llm'] - per_request['tool'], 0.0), 2)
+    report['stage_ms_per_request'] = per_request
+    report['upstream_requests'] = server.requests
+    report['router_hit_rate'] = round(stats['router']['hit_rate'], 3)
+    report['answer_cache_hit_rate'] = round(stats['answer_cache']['hit_rate'], 3)
+    return report
+
+
+async def run_remote(args, queries : list[str]) -> dict:
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        latencies, errors, elapsed = await drive(client, queries, args.concurrency)
+    return summarize(latencies, errors, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='Simulated seconds per LLM call')
+    parser.add_argument('--ingres-latency', type=float, default=0.2, help='Simulated seconds per INGRES download')
+    parser.add_argument('--search-latency', type=float, default=0.3, help='Simulated seconds per web search')
+    parser.add_argument('--no-answer-cache', action='store_true', help='Clear the answer cache before every request')
+    parser.add_argument('--cold-ingres', action='store_true', help='Clear the INGRES snapshot cache before every request')
+    parser.add_argument('--url', help='Benchmark a running server instead of the in-process app')
+    parser.add_argument('--json', help='Write the report to this file')
+    parser.add_argument('--baseline', help='Earlier --json report to compare p95 latency against')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed relative p95 increase over the baseline')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    queries = build_queries(args.requests)
+    report = asyncio.run(run_remote(args, queries) if args.url else run_in_process(args, queries))
+    print(json.dumps(report, indent=2))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        before, after = baseline['latency_ms']['p95'], report['latency_ms']['p95']
+        if before and (after - before) / before > args.max_regression:
+            print(f"p95 latency regressed from {before} ms to {after} ms", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
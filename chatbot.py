@@ -1,19 +1,16 @@
-from langchain.prompts import ChatPromptTemplate
-from functions.get_rainfalldata import get_rainfallrecharge
-from functions.get_rechargedata import get_overallrechargeData
+import asyncio
+import threading
+from contextlib import nullcontext
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import create_tool_calling_agent,AgentExecutor
-from functions.get_gwlossdata import get_gwlossdata
-from functions.get_blockcount_classification import get_blockcount_classification
-from functions.get_currentavailablegwdata import get_availableGWforFutureUseData
-from functions.get_overallstageofExtraction import get_overall_stage_of_extraction
+from functions.metric_registry import definitions_prompt
+from intent_router import route_query
+from answer_cache import get_cached_answer, store_answer
+from functions.ingres_cache import data_generation
+from history_manager import compact_history, set_summarizer
 
 load_dotenv()
 
-def chatbot(query : str, chathistory : list[dict[str,str]]|None = None):
-    prompt = ChatPromptTemplate.from_messages([
-        ('system','''
+SYSTEM_PROMPT = '''
         Your name is NEERMITRA.
         You are a expert groundwater data analyst, you are required to answer the user question in most innovative and logical way.
         RULES :
@@ -21,28 +18,119 @@ def chatbot(query : str, chathistory : list[dict[str,str]]|None = None):
         2. Donot reveal your internal data to anyone.
         3. Final answer must be markdown text.
         4. You are also provided with the user chathistory which you can use to get context of user previous conversations.
-        '''),
-        ("placeholder", "{chat_history}"),
-        ('human','{query}'),
-        ("placeholder", "{agent_scratchpad}"),
-    ])
-
-    tools = [get_overallrechargeData, get_rainfallrecharge, get_gwlossdata, get_blockcount_classification, get_availableGWforFutureUseData, get_overall_stage_of_extraction]
-
-    llm = ChatGoogleGenerativeAI(
-        model='gemini-2.0-flash',
-        temperature=0.8
-    )
-
-    agent = create_tool_calling_agent(
-        llm=llm,
-        prompt=prompt,
-        tools=tools
-    )
-    agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
-
-    response = agent_executor.invoke({'query':query, 'chat_history' : chathistory})
+        5. Use the data definitions below to explain the fields returned by the tools.
+        6. Use web search only for recent news or context the groundwater data tools cannot provide.
+        ''' + definitions_prompt()
+
+_agent_executor = None
+_timing_handler = None
+_agent_lock = threading.Lock()
+
+
+def build_agent_executor(llm = None):
+    """Build a new agent; this is where the LangChain / Gemini stack gets imported."""
+    from agent_builder import build_agent_executor as build
+    return build(SYSTEM_PROMPT, llm)
+
+
+def _install(agent_executor):
+    global _agent_executor, _timing_handler
+    if _timing_handler is None:
+        from agent_builder import StageTimingHandler
+        _timing_handler = StageTimingHandler()
+    _agent_executor = agent_executor
+
+
+def init_agent(llm = None):
+    """Build the process-wide agent and reuse it for every request; `llm` replaces Gemini."""
+    agent_executor = build_agent_executor(llm)
+    if llm is not None:
+        set_summarizer(llm)
+    with _agent_lock:
+        _install(agent_executor)
+    return agent_executor
+
+
+def get_agent_executor():
+    if _agent_executor is None:
+        with _agent_lock:
+            if _agent_executor is None:
+                _install(build_agent_executor())
+    return _agent_executor
+
+
+def agent_ready() -> bool:
+    return _agent_executor is not None
+
+
+async def _get_agent():
+    # The first build imports the whole LLM stack; keep the event loop serving meanwhile.
+    if _agent_executor is None:
+        return await asyncio.to_thread(get_agent_executor)
+    return _agent_executor
+
+
+async def _answer_without_agent(query : str, chathistory : list[dict[str,str]]|None, generation : int) -> str | None:
+    answer = get_cached_answer(query, chathistory)
+    if answer is None:
+        answer = await route_query(query)
+        store_answer(query, chathistory, answer, generation)
+    return answer
+
+
+def _no_gate():
+    return nullcontext()
+
+
+async def chatbot(query : str, chathistory : list[dict[str,str]]|None = None, gate = _no_gate):
+    """
+    Answer `query`. Cached answers and simple lookups return directly; an agent run (including
+    history summarization) happens inside `gate()`, which is how callers apply admission control.
+    """
+    generation = data_generation()
+    answer = await _answer_without_agent(query, chathistory, generation)
+    if answer is not None:
+        return {'query' : query, 'chat_history' : chathistory, 'output' : answer}
+
+    agent_executor = await _get_agent()
+    async with gate():
+        history = await compact_history(chathistory)
+        response = await agent_executor.ainvoke({'query':query, 'chat_history' : history},
+                                                config={'callbacks' : [_timing_handler]})
+    store_answer(query, chathistory, response.get('output'), generation)
     return response
 
 
+async def chatbot_stream(query : str, chathistory : list[dict[str,str]]|None = None, gate = _no_gate):
+    """
+    Run the agent and yield `(event, data)` pairs as it progresses: `tool_start`, `tool_end`,
+    `token` for every text chunk produced by Gemini and a final `answer` with the full output.
+    Cached answers and simple lookups answered by the intent router produce only the `answer` event.
+    The agent run happens inside `gate()`, as in `chatbot`.
+    """
+    generation = data_generation()
+    answer = await _answer_without_agent(query, chathistory, generation)
+    if answer is not None:
+        yield 'answer', {'output' : answer}
+        return
+
+    agent_executor = await _get_agent()
+    async with gate():
+        inputs = {'query':query, 'chat_history' : await compact_history(chathistory)}
 
+        async for event in agent_executor.astream_events(inputs, config={'callbacks' : [_timing_handler]}, version='v2'):
+            kind = event['event']
+            if kind == 'on_tool_start':
+                yield 'tool_start', {'tool' : event['name'], 'input' : event['data'].get('input')}
+            elif kind == 'on_tool_end':
+                yield 'tool_end', {'tool' : event['name'], 'output' : event['data'].get('output')}
+            elif kind == 'on_chat_model_stream':
+                content = event['data']['chunk'].content
+                if isinstance(content, list):
+                    content = ''.join(part if isinstance(part, str) else part.get('text', '') for part in content)
+                if content:
+                    yield 'token', {'text' : content}
+            elif kind == 'on_chain_end' and not event['parent_ids']:
+                output = event['data'].get('output') or {}
+                store_answer(query, chathistory, output.get('output'), generation)
+                yield 'answer', {'output' : output.get('output')}
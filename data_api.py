@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import logging
+import threading
+import httpx
+import orjson
+import zstandard
+from cachetools import LRUCache
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from functions.history_store import get_year_snapshot, is_supported_year, MAX_YEAR
+from functions.ingres_cache import stale_notice
+from functions.metric_engine import project
+from functions.metric_registry import METRIC_GROUPS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIN_COMPRESS_BYTES = 1024
+
+router = APIRouter(prefix='/data')
+
+_bodies = LRUCache(maxsize=256)
+_lock = threading.Lock()
+_zstd = threading.local()
+_stats = {'responses' : 0, 'not_modified' : 0, 'encoded' : 0, 'body_cache_hits' : 0}
+
+
+def _error(status : int, message : str, **extra) -> Response:
+    return Response(orjson.dumps({'success' : False, 'message' : message, **extra}),
+                    status_code=status, media_type='application/json')
+
+
+def _encoding(accept : str) -> str | None:
+    accepted = {part.split(';')[0].strip().lower() for part in accept.split(',')}
+    if 'zstd' in accepted:
+        return 'zstd'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def _compress(body : bytes, encoding : str) -> bytes:
+    if encoding == 'zstd':
+        if not hasattr(_zstd, 'compressor'):
+            _zstd.compressor = zstandard.ZstdCompressor(level=3)
+        return _zstd.compressor.compress(body)
+    return gzip.compress(body, compresslevel=6)
+
+
+def _respond(request : Request, etag : str, build) -> Response:
+    """
+    304 when the client already holds `etag`; otherwise the orjson body from `build()`, compressed
+    with zstd or gzip when the client accepts it. Encoded bodies are kept per ETag.
+    """
+    headers = {'ETag' : etag, 'Cache-Control' : 'no-cache', 'Vary' : 'Accept-Encoding'}
+    if etag in {tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')}:
+        with _lock:
+            _stats['not_modified'] += 1
+        return Response(status_code=304, headers=headers)
+
+    encoding = _encoding(request.headers.get('Accept-Encoding', ''))
+    with _lock:
+        _stats['responses'] += 1
+        cached = _bodies.get((etag, encoding))
+        if cached is not None:
+            _stats['body_cache_hits'] += 1
+    if cached is None:
+        body = orjson.dumps(build(), option=orjson.OPT_SERIALIZE_NUMPY)
+        if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+            cached = (body, None)
+        else:
+            cached = (_compress(body, encoding), encoding)
+            with _lock:
+                _stats['encoded'] += 1
+        with _lock:
+            _bodies[(etag, encoding)] = cached
+
+    body, used = cached
+    if used:
+        headers['Content-Encoding'] = used
+    return Response(body, media_type='application/json', headers=headers)
+
+
+def _etag(snapshot, *parts) -> str:
+    # A copy flagged stale carries a notice in its body, so it must not match the fresh one.
+    stale = getattr(snapshot, 'stale', False)
+    digest = hashlib.sha1('\x00'.join(str(part) for part in (snapshot.version, stale, *parts)).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+async def _year_snapshot(year : int):
+    if not is_supported_year(year):
+        return None, _error(404, f"Data not available for year {year}")
+    try:
+        snapshot = await get_year_snapshot(year)
+    except httpx.HTTPError as e:
+        logger.error(f"Request error: {str(e)}")
+        return None, _error(503, 'INGRES is unavailable, please retry shortly')
+    if snapshot is None:
+        return None, _error(503, 'API request failed')
+    return snapshot, None
+
+
+@router.get('/{metric}')
+async def read_metric(metric : str, request : Request, year : int = MAX_YEAR):
+    """Every state's fields of one metric group for `year`, as columns plus rows."""
+    group = METRIC_GROUPS.get(metric)
+    if group is None:
+        return _error(404, f"Unknown metric {metric}. Use any of {', '.join(METRIC_GROUPS)}")
+    snapshot, error = await _year_snapshot(year)
+    if error is not None:
+        return error
+
+    def build():
+        table = snapshot.table
+        values = table.columns(list(group['fields'].values())).round(2)
+        return {'success' : True,
+                'metric' : metric,
+                'year' : year,
+                'unit' : group['unit'],
+                'columns' : ['state', *group['fields']],
+                'rows' : [[name, *row] for name, row in zip(table.locations, values.tolist())],
+                **stale_notice(snapshot)}
+
+    return _respond(request, _etag(snapshot, metric, year), build)
+
+
+@router.get('/{metric}/{state}')
+async def read_state_metric(metric : str, state : str, request : Request, year : int = MAX_YEAR):
+    """One state's fields of one metric group for `year`."""
+    group = METRIC_GROUPS.get(metric)
+    if group is None:
+        return _error(404, f"Unknown metric {metric}. Use any of {', '.join(METRIC_GROUPS)}")
+    snapshot, error = await _year_snapshot(year)
+    if error is not None:
+        return error
+
+    match, suggestions = snapshot.locations.resolve(state.upper().strip())
+    if not match:
+        return _error(404, 'State data not available', did_you_mean=suggestions)
+
+    def build():
+        return {'success' : True,
+                'metric' : metric,
+                'year' : year,
+                'state' : match['locationName'],
+                'unit' : group['unit'],
+                'data' : project(group, match),
+                **stale_notice(snapshot)}
+
+    return _respond(request, _etag(snapshot, metric, year, match['locationName']), build)
+
+
+def get_data_api_stats() -> dict:
+    with _lock:
+        return {**_stats, 'cached_bodies' : len(_bodies)}
@@ -0,0 +1,109 @@
+import threading
+import httpx
+import numpy as np
+from cachetools import LRUCache
+from functions.history_store import get_year_snapshot, is_supported_year
+from functions.ingres_cache import stale_notice
+from functions.metric_table import METRICS, MetricTable
+
+# Ratios of per-state quantities the records do not carry (extraction over net availability),
+# so no honest national value can be derived; every other metric is a quantity and is summed.
+UNAGGREGATED_METRICS = {'stage_of_extraction'}
+
+_cache = LRUCache(maxsize=32)
+_lock = threading.Lock()
+
+
+def _round(value):
+    return None if value is None or np.isnan(value) else round(float(value), 2)
+
+
+class DerivedTable:
+    """
+    National aggregates plus per-state share, rank, percentile and change from the previous
+    year for every friendly metric of one assessment year, computed once per snapshot.
+    Arrays are `(state, metric)` aligned with `table.locations` and `metrics`.
+    """
+
+    def __init__(self, table : MetricTable, previous : MetricTable | None = None):
+        self.table = table
+        self.metrics = list(METRICS)
+        values = table.columns([METRICS[metric] for metric in self.metrics])
+        summed = np.array([metric not in UNAGGREGATED_METRICS for metric in self.metrics])
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            totals = np.nansum(values, axis=0)
+            self.values = values
+            self.counts = counts
+            self.national = np.where(summed & (counts > 0), totals, np.nan)
+            self.share = np.where(summed & (self.national != 0), values / self.national * 100, np.nan)
+            # NaN compares false, so missing states neither outrank nor count below anyone.
+            self.rank = np.where(valid, (values[None, :, :] > values[:, None, :]).sum(axis=1) + 1, np.nan)
+            self.percentile = np.where(valid, (values[None, :, :] <= values[:, None, :]).sum(axis=1) / np.maximum(counts, 1) * 100, np.nan)
+
+            self.previous = np.full_like(values, np.nan)
+            self.previous_national = np.full(len(self.metrics), np.nan)
+            if previous is not None:
+                earlier = previous.columns([METRICS[metric] for metric in self.metrics])
+                positions = {name : i for i, name in enumerate(previous.locations)}
+                for row, name in enumerate(table.locations):
+                    if name in positions:
+                        self.previous[row] = earlier[positions[name]]
+                self.previous_national = DerivedTable(previous).national
+            self.change = values - self.previous
+            self.change_pct = np.where(self.previous != 0, self.change / np.abs(self.previous) * 100, np.nan)
+
+    def national_summary(self) -> dict:
+        return {metric : {'value' : _round(self.national[m]),
+                          'aggregate' : None if metric in UNAGGREGATED_METRICS else 'sum',
+                          'states_reporting' : int(self.counts[m]),
+                          'change' : _round(self.national[m] - self.previous_national[m])}
+                for m, metric in enumerate(self.metrics)}
+
+    def state_summary(self, name : str, metrics : list[str] | None = None) -> tuple[str | None, dict, list[str]]:
+        row, suggestions = self.table.resolve(name)
+        if row is None:
+            return None, {}, suggestions
+        summary = {}
+        for metric in metrics or self.metrics:
+            m = self.metrics.index(metric)
+            summary[metric] = {
+                'value' : _round(self.values[row, m]),
+                'national' : _round(self.national[m]),
+                'share_of_national_pct' : _round(self.share[row, m]),
+                'rank' : None if np.isnan(self.rank[row, m]) else int(self.rank[row, m]),
+                'ranked_states' : int(self.counts[m]),
+                'percentile' : _round(self.percentile[row, m]),
+                'previous_year' : _round(self.previous[row, m]),
+                'change' : _round(self.change[row, m]),
+                'change_pct' : _round(self.change_pct[row, m]),
+            }
+        return self.table.locations[row], summary, []
+
+
+async def get_derived(year : int) -> tuple[DerivedTable | None, dict]:
+    """
+    Derived analytics for `year`, built on first use and reused until either snapshot changes,
+    plus the `stale_notice` fields to return with them. Staleness is not part of the cache key,
+    so it is reported per call rather than stored on the shared table.
+    """
+    snapshot = await get_year_snapshot(year)
+    if snapshot is None:
+        return None, {}
+    previous = None
+    if is_supported_year(year - 1):
+        try:
+            previous = await get_year_snapshot(year - 1)
+        except httpx.HTTPError:
+            previous = None
+
+    key = (snapshot.version, previous.version if previous is not None else None)
+    with _lock:
+        derived = _cache.get(key)
+    if derived is None:
+        derived = DerivedTable(snapshot.table, previous.table if previous is not None else None)
+        with _lock:
+            _cache[key] = derived
+    return derived, stale_notice(snapshot) or stale_notice(previous)
@@ -0,0 +1,59 @@
+from langchain.tools import tool
+from functions.derived_metrics import get_derived
+from functions.history_store import is_supported_year, MAX_YEAR
+from functions.metric_table import METRICS
+from functions.metric_engine import tool_errors
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@tool
+@tool_errors
+async def get_state_analytics(state : str | None = None, year : int = MAX_YEAR, metrics : list[str] | None = None):
+
+    """
+    Get precomputed analytics for an Indian state: each metric's value, the national total, the state's share of the national total, its rank and percentile among states and the change from the previous year.
+    Use this for share, rank, national total, percentile or year-over-year change questions instead of doing arithmetic over several tool calls.
+
+    Args:
+        state: Name of the Indian state (abbreviations accepted). Omit or pass "India" for national totals only
+        year: Year for data (eg : 2025 , 2024)
+        metrics: Metrics to include, any of stage_of_extraction, total_recharge, rainfall_recharge, loss, available_for_future_use, over_exploited_blocks, critical_blocks, semi_critical_blocks, safe_blocks. Omit for all
+
+    Returns:
+        Dictionary with per-metric analytics. Rank 1 is the highest value. National values are sums over states; national stage of extraction is not available (null) since it cannot be derived from state percentages. Stage of extraction is in percentage, block metrics are counts and the remaining metrics are in hectare-meter.
+    """
+    names = [metric.strip().lower().replace(' ', '_') for metric in metrics or []]
+    unknown = [metric for metric in names if metric not in METRICS]
+    if unknown:
+        return {'success' : False,
+                'message' : f"Unknown metric {', '.join(unknown)}. Use any of {', '.join(METRICS)}"}
+
+    if not is_supported_year(year):
+        return {"success" : False,
+                "message" : f"Data not available for year {year}"}
+
+    derived, notice = await get_derived(year)
+    if derived is None:
+        return {'success' : False,
+                'message' : 'API request failed'}
+
+    if not state or state.strip().lower() in ('india', 'all', 'national'):
+        national = derived.national_summary()
+        return {'success' : True,
+                'message' : f"National groundwater totals for year {year} are fetched",
+                'data' : {metric : national[metric] for metric in names or national},
+                **notice}
+
+    location, summary, suggestions = derived.state_summary(state, names or None)
+    if location is None:
+        return {'success' : False,
+                'message' : 'State data not available',
+                'did_you_mean' : suggestions}
+
+    return {'success' : True,
+            'message' : f"Groundwater analytics for state {location} for year {year} are fetched",
+            'data' : summary,
+            **notice}
@@ -0,0 +1,103 @@
+import re
+import numpy as np
+from langchain.tools import tool
+from functions.history_store import get_year_snapshot, is_supported_year, MAX_YEAR
+from functions.metric_table import METRICS, metric_key
+from functions.ingres_cache import stale_notice
+from functions.metric_engine import tool_errors
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FILTER = re.compile(r'^\s*([A-Za-z_ .]+?)\s*(>=|<=|==|!=|>|<)\s*(-?\d+(?:\.\d+)?)\s*$')
+OPERATORS = {
+    '>' : np.greater, '>=' : np.greater_equal,
+    '<' : np.less, '<=' : np.less_equal,
+    '==' : np.equal, '!=' : np.not_equal,
+}
+
+
+def _round(value : float):
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+@tool
+@tool_errors
+async def compare_states(metrics : list[str], states : list[str] | None = None, year : int = MAX_YEAR,
+                         sort_by : str | None = None, ascending : bool = False, top_n : int | None = None,
+                         filter : str | None = None):
+
+    """
+    Compare one or more groundwater metrics across many Indian states in a single call.
+    Use this for ranking, top-N, filtering or multi-state comparison questions instead of calling other tools once per state.
+
+    Args:
+        metrics: Metrics to return, any of stage_of_extraction, total_recharge, rainfall_recharge, loss, available_for_future_use, over_exploited_blocks, critical_blocks, semi_critical_blocks, safe_blocks
+        states: State names to include (abbreviations accepted). Omit or pass ["all"] for every state
+        year: Year for data (eg : 2025 , 2024)
+        sort_by: Metric to sort the rows by. Defaults to the first metric
+        ascending: Sort lowest first instead of highest first
+        top_n: Return only the first N rows after sorting
+        filter: Optional condition on one metric, e.g. "stage_of_extraction > 100"
+
+    Returns:
+        Compact table with one row per state and one column per metric. Stage of extraction is in percentage, block metrics are counts and the remaining metrics are in hectare-meter.
+    """
+    fields = [metric_key(metric) for metric in metrics]
+    unknown = [metric for metric, field in zip(metrics, fields) if field is None]
+    if not metrics or unknown:
+        return {'success' : False,
+                'message' : f"Unknown metric {', '.join(unknown)}. Use any of {', '.join(METRICS)}"}
+
+    if not is_supported_year(year):
+        return {"success" : False,
+                "message" : f"Data not available for year {year}"}
+
+    snapshot = await get_year_snapshot(year)
+    if snapshot is None:
+        return {'success' : False,
+                'message' : 'API request failed'}
+
+    table = snapshot.table
+    unresolved = []
+    if not states or any(state.strip().lower() == 'all' for state in states):
+        rows = np.arange(len(table.locations))
+    else:
+        positions = []
+        for state in states:
+            position, suggestions = table.resolve(state)
+            if position is None:
+                unresolved.append({'state' : state, 'did_you_mean' : suggestions})
+            elif position not in positions:
+                positions.append(position)
+        rows = np.array(positions, dtype=int)
+
+    if filter:
+        condition = FILTER.match(filter)
+        filter_field = metric_key(condition.group(1)) if condition else None
+        if filter_field is None:
+            return {'success' : False,
+                    'message' : f"Could not understand filter {filter}. Use the form '<metric> <operator> <number>'"}
+        column = table.column(filter_field)[rows]
+        rows = rows[OPERATORS[condition.group(2)](column, float(condition.group(3)))]
+
+    sort_field = metric_key(sort_by) if sort_by else fields[0]
+    if sort_field is None:
+        return {'success' : False,
+                'message' : f"Unknown sort metric {sort_by}. Use any of {', '.join(METRICS)}"}
+    keys = table.column(sort_field)[rows]
+    order = np.argsort(keys if ascending else -keys, kind='stable')
+    rows = rows[order]
+    if top_n:
+        rows = rows[:top_n]
+
+    values = table.columns(fields)[rows]
+    return {
+        'success' : True,
+        'message' : f"Comparison of {', '.join(metrics)} across {len(rows)} states for year {year} is fetched",
+        'columns' : ['state', *metrics],
+        'rows' : [[table.locations[row], *[_round(value) for value in line]] for row, line in zip(rows.tolist(), values)],
+        'unresolved' : unresolved,
+        **stale_notice(snapshot)
+    }
@@ -0,0 +1,71 @@
+from langchain.tools import tool
+from functions.history_store import is_supported_year, MAX_YEAR
+from functions.location_tree import resolve_path
+from functions.metric_table import METRICS, metric_key, lookup_path
+from functions.metric_engine import guard_tool
+from functions.ingres_cache import stale_notice
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def _subregion_data(year : int, metrics : list[str] | None, *path : str) -> dict:
+    names = metrics or list(METRICS)
+    fields = [metric_key(metric) for metric in names]
+    unknown = [metric for metric, field in zip(names, fields) if field is None]
+    if unknown:
+        return {'success' : False,
+                'message' : f"Unknown metric {', '.join(unknown)}. Use any of {', '.join(METRICS)}"}
+
+    if not is_supported_year(year):
+        return {"success" : False,
+                "message" : f"Data not available for year {year}"}
+
+    node, error = await resolve_path(year, *path)
+    if node is None:
+        return error
+
+    return {
+        'success' : True,
+        'message' : f"Groundwater data for {node.loctype.lower()} {node.name} is fetched. Stage of extraction is in percentage, block metrics are counts and the remaining metrics are in hectare-meter",
+        'data' : {name : lookup_path(node.record, field) for name, field in zip(names, fields)},
+        **stale_notice(node.snapshot)
+    }
+
+
+@tool
+async def get_district_data(state : str, district : str, year : int = MAX_YEAR, metrics : list[str] | None = None):
+
+    """
+    Get groundwater data for one district of an Indian state. Only that state's districts are downloaded.
+
+    Args:
+        state: Name of the Indian state (e.g., "MADHYA PRADESH", "RAJASTHAN"). Abbreviations and old names such as "MP" or "Orissa" are accepted
+        district: Name of the district in that state (e.g., "JAIPUR")
+        year: Year for data (eg : 2025 , 2024)
+        metrics: Metrics to return, any of stage_of_extraction, total_recharge, rainfall_recharge, loss, available_for_future_use, over_exploited_blocks, critical_blocks, semi_critical_blocks, safe_blocks. Omit for all
+
+    Returns:
+        Dictionary with the requested metric values for the district.
+    """
+    return await guard_tool('get_district_data', _subregion_data(year, metrics, state, district))
+
+
+@tool
+async def get_block_data(state : str, district : str, block : str, year : int = MAX_YEAR, metrics : list[str] | None = None):
+
+    """
+    Get groundwater data for one block (assessment unit) of a district. Only that district's blocks are downloaded.
+
+    Args:
+        state: Name of the Indian state (e.g., "MADHYA PRADESH", "RAJASTHAN"). Abbreviations and old names such as "MP" or "Orissa" are accepted
+        district: Name of the district containing the block
+        block: Name of the block
+        year: Year for data (eg : 2025 , 2024)
+        metrics: Metrics to return, any of stage_of_extraction, total_recharge, rainfall_recharge, loss, available_for_future_use. Omit for all
+
+    Returns:
+        Dictionary with the requested metric values for the block.
+    """
+    return await guard_tool('get_block_data', _subregion_data(year, metrics, state, district, block))
@@ -0,0 +1,59 @@
+from langchain.tools import tool
+from functions.history_store import get_history_store, MIN_YEAR, MAX_YEAR
+from functions.metric_table import METRICS
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@tool
+async def get_groundwater_trend(state : str, metric : str, start_year : int, end_year : int):
+
+    """
+    Get the year-wise values of one groundwater metric for an Indian state across a range of assessment years.
+    Use this for trend, growth or comparison-over-time questions instead of calling other tools once per year.
+    
+    Args:
+        state: Name of the Indian state (e.g., "MADHYA PRADESH", "RAJASTHAN"). Abbreviations and old names such as "MP" or "Orissa" are accepted
+        metric: One of stage_of_extraction, total_recharge, rainfall_recharge, loss, available_for_future_use, over_exploited_blocks, critical_blocks, semi_critical_blocks, safe_blocks
+        start_year: First year of the range (eg : 2017)
+        end_year: Last year of the range (eg : 2025)
+    
+    Returns:
+        Dictionary mapping each available year to the metric value, plus the years for which no data is stored.
+    """
+    try:
+        metric_key = metric.strip().lower().replace(' ', '_')
+        if metric_key not in METRICS:
+            return {'success' : False,
+                    'message' : f"Unknown metric {metric}. Use one of {', '.join(METRICS)}"}
+
+        store = get_history_store()
+        start_year, end_year = min(start_year, end_year), max(start_year, end_year)
+        start_year = max(start_year, MIN_YEAR)
+        end_year = min(end_year, max([MAX_YEAR, *store.years]))
+        if start_year > end_year:
+            return {'success' : False,
+                    'message' : f"Data is only available from {MIN_YEAR} to {end_year}"}
+
+        location, points, suggestions = store.series(state, METRICS[metric_key], start_year, end_year)
+
+        if location is None:
+            return {'success' : False,
+                    'message' : 'State data not available',
+                    'did_you_mean' : suggestions}
+
+        return {
+            'success' : True,
+            'message' : f"Year-wise {metric_key} for state {location} is fetched. Stage of extraction is in percentage, block metrics are counts and the remaining metrics are in hectare-meter",
+            'data' : points,
+            'missing_years' : [year for year in range(start_year, end_year + 1) if year not in points]
+        }
+
+    except Exception as e:
+        logger.error(f"Unexpected error in get_groundwater_trend: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Unexpected error occurred: {str(e)}'
+        }
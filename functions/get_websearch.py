@@ -0,0 +1,37 @@
+import asyncio
+import httpx
+from langchain.tools import tool
+from functions.websearch import cached_search, record_outcome
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@tool
+async def search_web(query : str):
+
+    """
+    Search the web for recent news or context about groundwater in India that the INGRES data tools do not cover (policies, schemes, droughts, events).
+    Do not use this for groundwater figures; use the data tools for those.
+
+    Args:
+        query: Short search query (eg : "Punjab groundwater depletion news 2025")
+
+    Returns:
+        Dictionary with up to a few deduplicated, truncated results, each with title, snippet and link.
+    """
+    try:
+        results = await cached_search(query)
+        return {'success' : True,
+                'message' : f"Web search results for {query} are fetched",
+                'results' : results}
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        record_outcome('timeouts')
+        return {'success' : False,
+                'message' : 'Web search timed out. Answer from the groundwater data instead.'}
+    except Exception as e:
+        logger.error(f"Unexpected error in search_web: {str(e)}")
+        record_outcome('failures')
+        return {'success' : False,
+                'message' : 'Web search is unavailable. Answer from the groundwater data instead.'}
@@ -0,0 +1,312 @@
+import os
+import gzip
+import json
+import hashlib
+import asyncio
+import logging
+import zipfile
+import argparse
+import threading
+from pathlib import Path
+import numpy as np
+from functions.ingres_cache import get_snapshot, fetch_ingres_data, country_payload, bump_data_generation, pin_snapshot
+from functions.location_index import LocationIndex
+from functions.metric_table import FIELDS, MetricTable, lookup_path, to_float
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(os.getenv('INGRES_SNAPSHOT_DIR', Path(__file__).resolve().parent.parent / 'data' / 'snapshots'))
+# Columnar store built from SNAPSHOT_DIR by `python -m functions.history_store build`; loading it
+# skips parsing every snapshot, which is most of a cold start's data work. The Vercel Python
+# builder has no build hook, so before deploying: ingest the years to serve, run `build`, and
+# commit data/snapshots/ and data/prebuilt/store.npz, which vercel.json bundles with the function.
+PREBUILT_PATH = Path(os.getenv('PREBUILT_STORE', Path(__file__).resolve().parent.parent / 'data' / 'prebuilt' / 'store.npz'))
+MIN_YEAR = 2014
+MAX_YEAR = 2025
+
+def assessment_year(year : int) -> str:
+    return f'{year - 1}-{year}'
+
+
+def snapshot_path(year : int) -> Path:
+    return SNAPSHOT_DIR / f'{assessment_year(year)}.json.gz'
+
+
+class StoredYear:
+    """Read view of one assessment year in the store, resolving states like a live snapshot."""
+
+    def __init__(self, store : 'HistoryStore', year : int):
+        self.store = store
+        self.year = year
+        self.version = f'store-{year}-{store.version}'
+
+    @property
+    def locations(self) -> 'StoredYear':
+        return self
+
+    def resolve(self, name : str) -> tuple[dict | None, list[str]]:
+        return self.store.record(name, self.year)
+
+    @property
+    def table(self) -> MetricTable:
+        return self.store.table(self.year)
+
+
+class HistoryStore:
+    """
+    Columnar in-memory copy of every offline INGRES snapshot.
+
+    `values[s, y, m]` holds metric `FIELDS[m]` for state `states[s]` in year `years[y]`;
+    missing values are NaN.
+    """
+
+    def __init__(self, tables : dict[int, list[dict]]):
+        years = sorted(tables)
+        year_pos = {year : i for i, year in enumerate(years)}
+
+        names = {}
+        for records in tables.values():
+            for item in records:
+                if item.get('locationName'):
+                    names.setdefault(item['locationName'], len(names))
+
+        values = np.full((len(names), len(years), len(FIELDS)), np.nan)
+        present = np.zeros((len(names), len(years)), dtype=bool)
+        for year, records in tables.items():
+            y = year_pos[year]
+            for item in records:
+                if not item.get('locationName'):
+                    continue
+                s = names[item['locationName']]
+                present[s, y] = True
+                values[s, y, :] = [to_float(lookup_path(item, path)) for path in FIELDS]
+
+        self._setup(list(names), years, values, present)
+
+    def _setup(self, states : list[str], years : list[int], values : np.ndarray, present : np.ndarray):
+        self.states = states
+        self.years = years
+        self.metrics = list(FIELDS)
+        self.values = values
+        self.present = present
+        self._year_pos = {year : i for i, year in enumerate(self.years)}
+        self._metric_pos = {metric : i for i, metric in enumerate(self.metrics)}
+        self._index = LocationIndex([{'locationName' : name, 'position' : pos} for pos, name in enumerate(states)])
+        # Hash of the contents, so a corrected snapshot changes ETags and derived-table cache keys.
+        digest = hashlib.sha1('\0'.join(states).encode())
+        for array in (np.asarray(years), values, present):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        self.version = digest.hexdigest()[:16]
+        self.sources = []
+        self._tables = {}
+
+    def save(self, path : Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, states=np.array(self.states), years=np.array(self.years),
+                                metrics=np.array(self.metrics), values=self.values, present=self.present,
+                                sources=np.array(self.sources, dtype=str))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path : Path) -> 'HistoryStore':
+        """Read a store written by `save`; raises ValueError when it was built for other metrics."""
+        with np.load(path, allow_pickle=False) as arrays:
+            if arrays['metrics'].tolist() != list(FIELDS):
+                raise ValueError('prebuilt store was built for a different metric set')
+            store = cls.__new__(cls)
+            store._setup(arrays['states'].tolist(), arrays['years'].tolist(), arrays['values'], arrays['present'])
+            store.sources = arrays['sources'].tolist() if 'sources' in arrays else None
+        return store
+
+    def has_year(self, year : int) -> bool:
+        return year in self._year_pos
+
+    def year(self, year : int) -> StoredYear | None:
+        return StoredYear(self, year) if year in self._year_pos else None
+
+    def table(self, year : int) -> MetricTable:
+        y = self._year_pos[year]
+        if y not in self._tables:
+            rows = np.flatnonzero(self.present[:, y])
+            self._tables[y] = MetricTable([self.states[s] for s in rows], self.values[rows, y, :])
+        return self._tables[y]
+
+    def resolve_state(self, name : str) -> tuple[int | None, list[str]]:
+        match, suggestions = self._index.resolve(name)
+        return (match['position'], []) if match else (None, suggestions)
+
+    def record(self, name : str, year : int) -> tuple[dict | None, list[str]]:
+        s, suggestions = self.resolve_state(name)
+        y = self._year_pos.get(year)
+        if s is None or y is None or not self.present[s, y]:
+            return None, suggestions
+
+        record = {'locationName' : self.states[s]}
+        for m, path in enumerate(self.metrics):
+            node = record
+            *parents, leaf = path.split('.')
+            for part in parents:
+                node = node.setdefault(part, {})
+            value = self.values[s, y, m]
+            node[leaf] = None if np.isnan(value) else value.item()
+        return record, []
+
+    def series(self, name : str, metric : str, start_year : int, end_year : int) -> tuple[str | None, dict[int, float | None], list[str]]:
+        s, suggestions = self.resolve_state(name)
+        if s is None:
+            return None, {}, suggestions
+
+        m = self._metric_pos[metric]
+        points = {}
+        for year in self.years:
+            y = self._year_pos[year]
+            if start_year <= year <= end_year and self.present[s, y]:
+                value = self.values[s, y, m]
+                points[year] = None if np.isnan(value) else value.item()
+        return self.states[s], points, []
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _source(path : Path, content : bytes) -> str:
+    return f"{path.name}:{hashlib.sha1(content).hexdigest()}"
+
+
+def snapshot_sources() -> list[str]:
+    """Name and content digest of every snapshot file; git checkouts do not keep mtimes, so compare these."""
+    return [_source(path, path.read_bytes()) for path in sorted(SNAPSHOT_DIR.glob('*.json.gz'))]
+
+
+def _load_prebuilt() -> HistoryStore | None:
+    """The prebuilt store, unless it is missing, unreadable or built from other snapshot files."""
+    if not PREBUILT_PATH.exists():
+        return None
+    try:
+        store = HistoryStore.load(PREBUILT_PATH)
+        current = snapshot_sources()
+    except (ValueError, OSError, KeyError, zipfile.BadZipFile) as e:
+        logger.error(f"Ignoring unreadable prebuilt store {PREBUILT_PATH}: {str(e)}")
+        return None
+    if store.sources != current:
+        logger.info(f"Ignoring {PREBUILT_PATH}: it was built from different snapshots, run build again")
+        return None
+    logger.info(f"Loaded prebuilt INGRES store for years {store.years}")
+    return store
+
+
+def load_store(prebuilt : bool = True) -> HistoryStore:
+    store = _load_prebuilt() if prebuilt else None
+    if store is not None:
+        return store
+
+    tables, sources = {}, []
+    for path in sorted(SNAPSHOT_DIR.glob('*.json.gz')):
+        try:
+            content = path.read_bytes()
+            sources.append(_source(path, content))
+            year = int(path.name.split('.')[0].split('-')[-1])
+            tables[year] = json.loads(gzip.decompress(content))
+        except (ValueError, OSError, EOFError) as e:
+            logger.error(f"Skipping unreadable snapshot {path}: {str(e)}")
+    logger.info(f"Loaded offline INGRES snapshots for years {sorted(tables)}")
+    store = HistoryStore(tables)
+    store.sources = sources
+    return store
+
+
+def get_history_store() -> HistoryStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = load_store()
+    return _store
+
+
+def reload_store() -> HistoryStore:
+    global _store
+    store = load_store()
+    with _store_lock:
+        _store = store
+    bump_data_generation()
+    return store
+
+
+def is_supported_year(year : int) -> bool:
+    store = get_history_store()
+    latest = max([MAX_YEAR, *store.years])
+    return MIN_YEAR <= year <= latest
+
+
+async def get_year_snapshot(year : int):
+    """
+    Return something with a `.locations.resolve(state)` for `year`: the offline store when
+    it holds that year, otherwise the (cached) live INGRES response for that assessment year.
+    """
+    stored = pin_snapshot(('store', year), get_history_store().year(year))
+    if stored is not None:
+        return stored
+    return await get_snapshot(country_payload(assessment_year(year)))
+
+
+def ingest(year : int, source : str | None = None) -> Path:
+    if source:
+        opener = gzip.open if source.endswith('.gz') else open
+        with opener(source, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = asyncio.run(fetch_ingres_data(country_payload(assessment_year(year))))
+        if data is None:
+            raise RuntimeError(f"INGRES returned no data for {assessment_year(year)}")
+
+    if not isinstance(data, list) or not all(isinstance(item, dict) and 'locationName' in item for item in data):
+        raise ValueError('Snapshot must be the list of location records returned by getBusinessDataForUserOpen')
+
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    path = snapshot_path(year)
+    tmp = path.with_suffix('.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    tmp.replace(path)
+    store = reload_store()
+    if PREBUILT_PATH.exists():
+        # Keep a committed prebuilt store in step with the snapshots instead of letting it go stale.
+        store.save(PREBUILT_PATH)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage offline INGRES snapshots')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest_cmd = commands.add_parser('ingest', help="Store one assessment year's country snapshot")
+    ingest_cmd.add_argument('year', type=int, help='Assessment year, e.g. 2025 for 2024-2025')
+    ingest_cmd.add_argument('--file', help='Recorded getBusinessDataForUserOpen response (.json or .json.gz); fetched live when omitted')
+
+    commands.add_parser('list', help='List the stored years')
+    commands.add_parser('build', help=f'Write the prebuilt store loaded on cold start ({PREBUILT_PATH})')
+
+    args = parser.parse_args()
+    if args.command == 'ingest':
+        path = ingest(args.year, args.file)
+        print(f"Stored {assessment_year(args.year)} snapshot at {path}")
+    elif args.command == 'build':
+        store = load_store(prebuilt=False)
+        if not store.years:
+            parser.exit(1, f"No snapshots in {SNAPSHOT_DIR}; run `ingest` for each year before `build`\n")
+        store.save(PREBUILT_PATH)
+        print(f"Wrote prebuilt store for years {store.years} to {PREBUILT_PATH}; commit it with the snapshots before deploying")
+    else:
+        store = get_history_store()
+        for year in store.years:
+            print(f"{year} ({assessment_year(year)}): {int(store.present[:, store.years.index(year)].sum())} locations")
+        print(f"Prebuilt store {PREBUILT_PATH}: {'current' if _load_prebuilt() is not None else 'missing or out of date, run build'}")
+
+
+if __name__ == '__main__':
+    main()
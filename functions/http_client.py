@@ -0,0 +1,46 @@
+import os
+import time
+import httpx
+from timings import record_outbound
+
+CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '100'))
+MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', '20'))
+
+_client = None
+
+
+class _TimedTransport(httpx.AsyncHTTPTransport):
+    """Records every outbound request in the histogram, labelled `error` when no response arrived."""
+
+    async def handle_async_request(self, request : httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            record_outbound(request.url.host, 'error', time.perf_counter() - started)
+            raise
+        record_outbound(request.url.host, str(response.status_code), time.perf_counter() - started)
+        return response
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled async client with keep-alive and explicit timeouts."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            transport=_TimedTransport(limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                                          max_keepalive_connections=MAX_KEEPALIVE, keepalive_expiry=60)),
+            headers={'Accept' : 'application/json'}
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
@@ -0,0 +1,368 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import asyncio
+import threading
+import contextvars
+import httpx
+import orjson
+from pathlib import Path
+from cachetools import LRUCache, TLRUCache
+from dotenv import load_dotenv
+from functions.singleflight import SingleFlight
+from functions.ingres_client import post_ingres, get_client_stats, breaker
+from timings import stage_timer
+from functions.location_index import LocationIndex
+from functions.metric_table import MetricTable
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INGRES_URL = os.getenv('INGRES_API_URL', 'https://ingres.iith.ac.in/api/gec/getBusinessDataForUserOpen')
+INDIA_UUID = 'ffce954d-24e1-494b-ba7e-0931d8ad6085'
+
+CACHE_TTL = float(os.getenv('INGRES_CACHE_TTL', '900'))
+CACHE_MAX_BYTES = int(os.getenv('INGRES_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+STALE_MAX_BYTES = int(os.getenv('INGRES_STALE_MAX_BYTES', str(CACHE_MAX_BYTES)))
+# Vercel functions can only write under /tmp.
+LAST_GOOD_DIR = Path(os.getenv('INGRES_LAST_GOOD_DIR', Path('/tmp' if os.getenv('VERCEL') else Path(__file__).resolve().parent.parent / 'data') / 'last_good'))
+
+
+class Snapshot:
+    """
+    One decoded INGRES response together with the bookkeeping the cache needs. `stale` marks a
+    copy read back from disk because INGRES could not be reached.
+    """
+
+    __slots__ = ('data', 'fetched_at', 'nbytes', 'version', 'ttl', 'stale', '_locations', '_table')
+
+    def __init__(self, data, nbytes : int, version : str, ttl : float = CACHE_TTL,
+                 fetched_at : float | None = None, stale : bool = False):
+        self.data = data
+        self.nbytes = nbytes
+        self.version = version
+        self.ttl = ttl
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.stale = stale
+        self._locations = None
+        self._table = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def locations(self) -> LocationIndex:
+        if self._locations is None:
+            self._locations = LocationIndex(self.data)
+        return self._locations
+
+    @property
+    def table(self) -> MetricTable:
+        if self._table is None:
+            self._table = MetricTable.from_records(self.data)
+        return self._table
+
+    def as_stale(self) -> 'Snapshot':
+        """This snapshot marked stale, sharing its data and lookup indexes."""
+        if self.stale:
+            return self
+        snapshot = Snapshot(self.data, self.nbytes, self.version, self.ttl, self.fetched_at, stale=True)
+        snapshot._locations = self._locations
+        snapshot._table = self._table
+        return snapshot
+
+
+_cache = TLRUCache(maxsize=CACHE_MAX_BYTES, ttu=lambda key, snapshot, now: now + snapshot.ttl,
+                   getsizeof=lambda snapshot: snapshot.nbytes)
+_last_good = LRUCache(maxsize=STALE_MAX_BYTES, getsizeof=lambda snapshot: snapshot.nbytes)
+_lock = threading.Lock()
+_flights = SingleFlight('ingres')
+_background = set()
+_pins = contextvars.ContextVar('ingres_pins', default=None)
+_versions = {}
+_generation = 0
+_persisted = {}
+_refresh_failed = set()
+_stats = {'hits' : 0, 'misses' : 0, 'fetches' : 0, 'failures' : 0, 'uncacheable' : 0,
+          'stale_served' : 0, 'background_refreshes' : 0, 'disk_writes' : 0, 'disk_fallbacks' : 0}
+
+
+def location_payload(locname : str, loctype : str, locuuid : str, parentuuid : str,
+                     stateuuid : str | None = None, year : str = '2024-2025') -> dict:
+    return {
+        "approvalLevel": 1,
+        "category": "all",
+        "component": "recharge",
+        "computationType": "normal",
+        "locname": locname,
+        "loctype": loctype,
+        "locuuid": locuuid,
+        "parentuuid": parentuuid,
+        "period": "annual",
+        "stateuuid": stateuuid,
+        "verificationStatus": 1,
+        "view": "admin",
+        "year": year
+    }
+
+
+def country_payload(year : str = '2024-2025') -> dict:
+    return location_payload('INDIA', 'COUNTRY', INDIA_UUID, INDIA_UUID, None, year)
+
+
+def payload_key(payload : dict) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'))
+
+
+def _decode(content : bytes, ttl : float, **kwargs) -> Snapshot:
+    return Snapshot(data=orjson.loads(content), nbytes=len(content), version=hashlib.sha1(content).hexdigest()[:16],
+                    ttl=ttl, **kwargs)
+
+
+async def _download(payload : dict, ttl : float) -> tuple[Snapshot | None, bytes]:
+    with stage_timer('ingres_fetch'):
+        api_response = await post_ingres(INGRES_URL, payload)
+    if api_response.status_code != 200:
+        return None, b''
+
+    content = api_response.content
+    with stage_timer('json_parse'):
+        snapshot = await asyncio.to_thread(_decode, content, ttl)
+    return snapshot, content
+
+
+def _last_good_path(key : str) -> Path:
+    return LAST_GOOD_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+
+def _write_last_good(key : str, content : bytes):
+    path = _last_good_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix('.part')
+        partial.write_bytes(content)
+        partial.replace(path)
+    except OSError as e:
+        logger.warning(f"Could not write last good INGRES response to {path}: {str(e)}")
+        return
+    with _lock:
+        _stats['disk_writes'] += 1
+
+
+async def _persist(key : str, snapshot : Snapshot, content : bytes):
+    with _lock:
+        if _persisted.get(key) == snapshot.version:
+            return
+        _persisted[key] = snapshot.version
+    await asyncio.to_thread(_write_last_good, key, content)
+
+
+def _read_last_good(key : str, ttl : float) -> Snapshot | None:
+    path = _last_good_path(key)
+    try:
+        return _decode(path.read_bytes(), ttl, fetched_at=path.stat().st_mtime, stale=True)
+    except (OSError, ValueError):
+        return None
+
+
+async def _disk_fallback(key : str, ttl : float) -> Snapshot | None:
+    """Last good response from disk, marked stale and kept in memory for the next misses."""
+    snapshot = await asyncio.to_thread(_read_last_good, key, ttl)
+    if snapshot is None:
+        return None
+    logger.warning(f"INGRES unavailable, serving last good response from {time.ctime(snapshot.fetched_at)}")
+    with _lock:
+        _stats['disk_fallbacks'] += 1
+        if _last_good.get(key) is None:
+            try:
+                _last_good[key] = snapshot
+            except ValueError:
+                pass
+    return snapshot
+
+
+async def _fetch_and_store(key : str, payload : dict, ttl : float, force : bool = False) -> Snapshot | None:
+    if not force:
+        with _lock:
+            snapshot = _cache.get(key)
+        if snapshot is not None:
+            return snapshot
+
+    try:
+        snapshot, content = await _download(payload, ttl)
+    except BaseException:
+        with _lock:
+            _refresh_failed.add(key)
+        raise
+
+    with _lock:
+        _stats['fetches'] += 1
+        if snapshot is None:
+            _stats['failures'] += 1
+            _refresh_failed.add(key)
+            return None
+        _refresh_failed.discard(key)
+        if _versions.get(key, snapshot.version) != snapshot.version:
+            _bump_generation_locked()
+        _versions[key] = snapshot.version
+        try:
+            _cache[key] = snapshot
+            _last_good[key] = snapshot
+        except ValueError:
+            _stats['uncacheable'] += 1
+            logger.warning(f"INGRES response of {snapshot.nbytes} bytes exceeds cache size, serving uncached")
+    await _persist(key, snapshot, content)
+    return snapshot
+
+
+async def _revalidate(key : str, payload : dict, ttl : float):
+    try:
+        await _flights.do(key, _fetch_and_store, key, payload, ttl, True)
+    except Exception as e:
+        logger.warning(f"Background INGRES refresh failed, still serving the stale copy: {str(e)}")
+
+
+def _schedule_revalidation(key : str, payload : dict, ttl : float):
+    task = asyncio.create_task(_revalidate(key, payload, ttl))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def snapshot_context() -> contextvars.Context:
+    """
+    Copy of the current context in which every payload keeps resolving to the first snapshot
+    read for it. Tasks started with `context=snapshot_context().copy()` share those pins, so a
+    batch of requests sees one data version even if a refresh lands halfway through.
+    """
+    context = contextvars.copy_context()
+    context.run(_pins.set, {})
+    return context
+
+
+def pin_snapshot(key, snapshot):
+    """Return the snapshot already pinned under `key` in this context, pinning `snapshot` if none is."""
+    pins = _pins.get()
+    if pins is None or snapshot is None:
+        return snapshot
+    return pins.setdefault(key, snapshot)
+
+
+async def get_snapshot(payload : dict, ttl : float | None = None) -> Snapshot | None:
+    """
+    Return the INGRES response for `payload`, downloading it only when no fresh copy is cached.
+    `ttl` overrides the default lifetime of a newly downloaded entry.
+
+    Concurrent misses for the same payload share a single download. Once a payload has been
+    fetched successfully, an expired entry is served stale while it is re-downloaded in the
+    background; that copy has `stale` set once the breaker is open or its last refresh failed.
+    When INGRES fails and nothing is in memory, the last good response saved on disk
+    is served with `stale` set. Otherwise returns None when the upstream answered with a non-200
+    status, and network errors (including an open circuit breaker) propagate as `httpx` exceptions
+    so callers keep their existing error handling.
+    """
+    key = payload_key(payload)
+    pins = _pins.get()
+    if pins is not None and key in pins:
+        return pins[key]
+    return pin_snapshot(key, await _get_snapshot(key, payload, ttl))
+
+
+async def _get_snapshot(key : str, payload : dict, ttl : float | None) -> Snapshot | None:
+    ttl = CACHE_TTL if ttl is None else ttl
+    with _lock:
+        snapshot = _cache.get(key)
+        if snapshot is not None:
+            _stats['hits'] += 1
+            return snapshot
+        _stats['misses'] += 1
+        stale = _last_good.get(key)
+        if stale is not None:
+            _stats['stale_served'] += 1
+            # Expired copies are normally served while a refresh runs; once INGRES is known to be
+            # failing they are flagged so the answer says the data may be out of date.
+            if key in _refresh_failed or breaker.state != 'closed':
+                stale = stale.as_stale()
+
+    if stale is not None:
+        if key not in _flights:
+            _stats['background_refreshes'] += 1
+            _schedule_revalidation(key, payload, ttl)
+        return stale
+
+    try:
+        snapshot = await _flights.do(key, _fetch_and_store, key, payload, ttl)
+    except httpx.HTTPError:
+        snapshot = await _disk_fallback(key, ttl)
+        if snapshot is None:
+            raise
+        return snapshot
+    return snapshot if snapshot is not None else await _disk_fallback(key, ttl)
+
+
+async def refresh_snapshot(payload : dict, ttl : float | None = None) -> Snapshot | None:
+    """Download `payload` now and swap it in, whether or not the cached copy has expired."""
+    key = payload_key(payload)
+    return await _flights.do(key, _fetch_and_store, key, payload, CACHE_TTL if ttl is None else ttl, True)
+
+
+def last_good_snapshot(payload : dict) -> Snapshot | None:
+    with _lock:
+        return _last_good.get(payload_key(payload))
+
+
+def stale_notice(snapshot) -> dict:
+    """Extra tool-result fields flagging a last good copy served while INGRES is failing."""
+    if not getattr(snapshot, 'stale', False):
+        return {}
+    return {'stale' : True,
+            'as_of' : time.strftime('%Y-%m-%d %H:%M', time.localtime(snapshot.fetched_at)),
+            'note' : 'INGRES is currently unreachable, this is the last saved copy of the data'}
+
+
+async def fetch_ingres_data(payload : dict):
+    snapshot = await get_snapshot(payload)
+    return snapshot.data if snapshot is not None else None
+
+
+def _bump_generation_locked():
+    global _generation
+    _generation += 1
+    logger.info(f"INGRES data changed, data generation is now {_generation}")
+
+
+def bump_data_generation():
+    with _lock:
+        _bump_generation_locked()
+
+
+def data_generation() -> int:
+    """Counter that increases whenever the INGRES data behind any answer may have changed."""
+    return _generation
+
+
+def get_cache_stats() -> dict:
+    with _lock:
+        lookups = _stats['hits'] + _stats['misses']
+        return {
+            **_stats,
+            'hit_rate' : _stats['hits'] / lookups if lookups else 0.0,
+            'entries' : len(_cache),
+            'bytes' : _cache.currsize,
+            'max_bytes' : _cache.maxsize,
+            'ttl' : CACHE_TTL,
+            'generation' : _generation,
+            'coalescing' : _flights.stats(),
+            'upstream' : get_client_stats()
+        }
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _last_good.clear()
+        _refresh_failed.clear()
@@ -0,0 +1,163 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import httpx
+from functions.http_client import get_http_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = int(os.getenv('INGRES_MAX_RETRIES', '2'))
+RETRY_BASE_DELAY = float(os.getenv('INGRES_RETRY_BASE_DELAY', '0.2'))
+RETRY_MAX_DELAY = float(os.getenv('INGRES_RETRY_MAX_DELAY', '2'))
+RETRY_BUDGET_RATIO = float(os.getenv('INGRES_RETRY_BUDGET_RATIO', '0.2'))
+RETRY_BUDGET_MAX = float(os.getenv('INGRES_RETRY_BUDGET_MAX', '10'))
+BREAKER_FAILURES = int(os.getenv('INGRES_BREAKER_FAILURES', '5'))
+BREAKER_RESET = float(os.getenv('INGRES_BREAKER_RESET', '30'))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised without contacting INGRES while the circuit breaker is open."""
+
+
+class RetryBudget:
+    """
+    Token bucket shared by every INGRES call: each first attempt adds `ratio` tokens and each
+    retry spends one, so retries stay a bounded fraction of traffic when upstream degrades.
+    """
+
+    def __init__(self, ratio : float = RETRY_BUDGET_RATIO, maximum : float = RETRY_BUDGET_MAX):
+        self.ratio = ratio
+        self.maximum = maximum
+        self.tokens = maximum
+        self.spent = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.maximum, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                self.denied += 1
+                return False
+            self.tokens -= 1
+            self.spent += 1
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'tokens' : round(self.tokens, 2), 'retries' : self.spent, 'denied' : self.denied}
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failed calls and then rejects calls for `reset` seconds;
+    after that one probe call is let through, which closes the breaker again if it succeeds.
+    """
+
+    def __init__(self, failures : int = BREAKER_FAILURES, reset : float = BREAKER_RESET, clock = time.monotonic):
+        self.failures = failures
+        self.reset = reset
+        self.clock = clock
+        self.state = 'closed'
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'open' and self.clock() - self.opened_at >= self.reset:
+                self.state = 'half_open'
+            if self.state == 'closed' or (self.state == 'half_open' and not self._probing):
+                self._probing = self.state == 'half_open'
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logger.info('INGRES circuit breaker closed')
+            self.state = 'closed'
+            self.consecutive = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive += 1
+            self._probing = False
+            if self.state == 'half_open' or (self.state == 'closed' and self.consecutive >= self.failures):
+                if self.state == 'closed':
+                    self.opened += 1
+                    logger.warning(f"INGRES circuit breaker opened after {self.consecutive} failures")
+                self.state = 'open'
+                self.opened_at = self.clock()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'state' : self.state, 'open' : self.state != 'closed', 'consecutive_failures' : self.consecutive,
+                    'opened' : self.opened, 'rejected' : self.rejected}
+
+
+budget = RetryBudget()
+breaker = CircuitBreaker()
+
+
+def _backoff(attempt : int) -> float:
+    """Full jitter: uniform in [0, min(max delay, base * 2^attempt)]."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+async def post_ingres(url : str, payload : dict) -> httpx.Response:
+    """
+    POST `payload` to INGRES through the shared client, retrying timeouts, connection errors and
+    429/5xx answers with jittered backoff while the retry budget allows. Raises CircuitOpenError
+    at once while the breaker is open; the last error or response is returned once retries stop.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError('INGRES is unavailable, circuit breaker is open')
+
+    budget.deposit()
+    attempt = 0
+    try:
+        while True:
+            try:
+                response = await get_http_client().post(url=url, json=payload)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                if attempt < MAX_RETRIES and budget.withdraw():
+                    logger.warning(f"INGRES request failed ({type(e).__name__}), retrying")
+                    await asyncio.sleep(_backoff(attempt))
+                    attempt += 1
+                    continue
+                raise
+
+            if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES and budget.withdraw():
+                logger.warning(f"INGRES answered {response.status_code}, retrying")
+                await asyncio.sleep(_backoff(attempt))
+                attempt += 1
+                continue
+            break
+    except BaseException:
+        # Any way out without a response, cancellation included, must settle a half-open probe.
+        breaker.record_failure()
+        raise
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def get_client_stats() -> dict:
+    return {'breaker' : breaker.stats(), 'retry_budget' : budget.stats()}
@@ -0,0 +1,106 @@
+import os
+import time
+import asyncio
+import logging
+from functions.ingres_cache import country_payload, last_good_snapshot, refresh_snapshot, CACHE_TTL
+from functions.history_store import MAX_YEAR, assessment_year, get_history_store
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = float(os.getenv('INGRES_REFRESH_INTERVAL', '30'))
+REFRESH_AHEAD = float(os.getenv('INGRES_REFRESH_AHEAD', '0.8'))
+REFRESH_YEARS = [int(year) for year in os.getenv('INGRES_REFRESH_YEARS', str(MAX_YEAR)).split(',') if year.strip()]
+MAX_BACKOFF = float(os.getenv('INGRES_REFRESH_MAX_BACKOFF', '600'))
+
+
+class SnapshotRefresher:
+    """
+    Keeps the country snapshots warm from inside the FastAPI lifespan.
+
+    Each tracked snapshot is re-downloaded once it has used `REFRESH_AHEAD` of its TTL, so
+    requests never wait for an expiry. A failed refresh leaves the previous snapshot in
+    place (the cache keeps serving it stale) and is retried with exponential backoff.
+    """
+
+    def __init__(self, years : list[int] = REFRESH_YEARS, interval : float = REFRESH_INTERVAL, ahead : float = REFRESH_AHEAD):
+        self.years = years
+        self.interval = interval
+        self.ahead = ahead
+        self._task = None
+        self._status = {'refreshes' : 0, 'failures' : 0, 'consecutive_failures' : 0,
+                        'last_attempt_at' : None, 'last_success_at' : None, 'last_ok' : None, 'last_error' : None}
+
+    def payloads(self) -> list[dict]:
+        store = get_history_store()
+        return [country_payload(assessment_year(year)) for year in self.years if not store.has_year(year)]
+
+    def _due(self, payload : dict) -> bool:
+        snapshot = last_good_snapshot(payload)
+        return snapshot is None or snapshot.age >= snapshot.ttl * self.ahead
+
+    async def refresh_due(self) -> bool:
+        ok = True
+        for payload in self.payloads():
+            if not self._due(payload):
+                continue
+            self._status['last_attempt_at'] = time.time()
+            try:
+                snapshot = await refresh_snapshot(payload, CACHE_TTL)
+                error = None if snapshot is not None else 'INGRES returned a non-200 status'
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+            if error is None:
+                self._status['refreshes'] += 1
+                self._status['last_success_at'] = time.time()
+                self._status['consecutive_failures'] = 0
+            else:
+                ok = False
+                self._status['failures'] += 1
+                self._status['consecutive_failures'] += 1
+                self._status['last_error'] = error
+                logger.warning(f"INGRES refresh of {payload['year']} failed, serving last good snapshot: {error}")
+            self._status['last_ok'] = error is None
+        return ok
+
+    def _delay(self) -> float:
+        failures = self._status['consecutive_failures']
+        # Cap the exponent first: 2 ** failures overflows a float after about a week of outage.
+        return min(self.interval * 2 ** min(failures, 16), MAX_BACKOFF) if failures else self.interval
+
+    async def run(self):
+        while True:
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                # An unexpected error must not end the task during the outage it exists to ride out.
+                logger.exception(f"INGRES refresh loop failed, retrying: {str(e)}")
+            await asyncio.sleep(self._delay())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        ages = {}
+        for payload in self.payloads():
+            snapshot = last_good_snapshot(payload)
+            ages[payload['year']] = round(snapshot.age, 1) if snapshot is not None else None
+        known = [age for age in ages.values() if age is not None]
+        return {**self._status,
+                'running' : self._task is not None and not self._task.done(),
+                'snapshot_age_seconds' : max(known) if known else -1,
+                'snapshot_ages' : ages}
+
+
+refresher = SnapshotRefresher()
@@ -0,0 +1,117 @@
+import re
+import difflib
+
+FUZZY_CUTOFF = 0.8
+FUZZY_MAX_QUERY_LENGTH = 48
+
+STATE_NAMES = [
+    'ANDHRA PRADESH', 'ARUNACHAL PRADESH', 'ASSAM', 'BIHAR', 'CHHATTISGARH', 'GOA', 'GUJARAT', 'HARYANA',
+    'HIMACHAL PRADESH', 'JHARKHAND', 'KARNATAKA', 'KERALA', 'MADHYA PRADESH', 'MAHARASHTRA', 'MANIPUR',
+    'MEGHALAYA', 'MIZORAM', 'NAGALAND', 'ODISHA', 'PUNJAB', 'RAJASTHAN', 'SIKKIM', 'TAMIL NADU', 'TELANGANA',
+    'TRIPURA', 'UTTAR PRADESH', 'UTTARAKHAND', 'WEST BENGAL', 'ANDAMAN AND NICOBAR ISLANDS', 'CHANDIGARH',
+    'DADRA AND NAGAR HAVELI AND DAMAN AND DIU', 'DELHI', 'JAMMU AND KASHMIR', 'LADAKH', 'LAKSHADWEEP', 'PUDUCHERRY',
+]
+
+ALIASES = {
+    'ORISSA' : 'ODISHA',
+    'JK' : 'JAMMU AND KASHMIR',
+    'J AND K' : 'JAMMU AND KASHMIR',
+    'JAMMU KASHMIR' : 'JAMMU AND KASHMIR',
+    'KASHMIR' : 'JAMMU AND KASHMIR',
+    'MP' : 'MADHYA PRADESH',
+    'UP' : 'UTTAR PRADESH',
+    'AP' : 'ANDHRA PRADESH',
+    'HP' : 'HIMACHAL PRADESH',
+    'UK' : 'UTTARAKHAND',
+    'UTTARANCHAL' : 'UTTARAKHAND',
+    'TN' : 'TAMIL NADU',
+    'TAMILNADU' : 'TAMIL NADU',
+    'WB' : 'WEST BENGAL',
+    'BENGAL' : 'WEST BENGAL',
+    'AS' : 'ASSAM',
+    'GJ' : 'GUJARAT',
+    'MH' : 'MAHARASHTRA',
+    'RJ' : 'RAJASTHAN',
+    'KA' : 'KARNATAKA',
+    'KL' : 'KERALA',
+    'PB' : 'PUNJAB',
+    'HR' : 'HARYANA',
+    'BR' : 'BIHAR',
+    'JH' : 'JHARKHAND',
+    'CG' : 'CHHATTISGARH',
+    'CHHATISGARH' : 'CHHATTISGARH',
+    'TS' : 'TELANGANA',
+    'TELENGANA' : 'TELANGANA',
+    'GOA STATE' : 'GOA',
+    'NCT OF DELHI' : 'DELHI',
+    'NEW DELHI' : 'DELHI',
+    'PONDICHERRY' : 'PUDUCHERRY',
+    'PONDY' : 'PUDUCHERRY',
+    'ARUNACHAL' : 'ARUNACHAL PRADESH',
+    'ANDAMAN' : 'ANDAMAN AND NICOBAR ISLANDS',
+    'ANDAMAN AND NICOBAR' : 'ANDAMAN AND NICOBAR ISLANDS',
+    'A AND N ISLANDS' : 'ANDAMAN AND NICOBAR ISLANDS',
+    'DNH' : 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU',
+    'DAMAN AND DIU' : 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU',
+    'DADRA AND NAGAR HAVELI' : 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU',
+}
+
+
+def normalize_location(name : str) -> str:
+    name = name.upper().replace('&', ' AND ')
+    name = re.sub(r'[^A-Z0-9 ]+', ' ', name)
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+class LocationIndex:
+    """
+    Hash index over the records of one INGRES response keyed on normalized `locationName`.
+
+    Exact and alias lookups are O(1); a bounded fuzzy match is only attempted on a miss.
+    """
+
+    def __init__(self, records : list[dict]):
+        self._by_name = {}
+        for item in records:
+            name = item.get('locationName')
+            if name:
+                self._by_name[normalize_location(name)] = item
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def names(self) -> list[str]:
+        return [item['locationName'] for item in self._by_name.values()]
+
+    def get(self, name : str) -> dict | None:
+        key = normalize_location(name)
+        match = self._by_name.get(key)
+        if match is None and key in ALIASES:
+            match = self._by_name.get(ALIASES[key])
+        return match
+
+    def resolve(self, name : str) -> tuple[dict | None, list[str]]:
+        """
+        Return `(record, [])` on an exact, alias or confident fuzzy hit, otherwise
+        `(None, suggestions)` with the closest known location names.
+        """
+        match = self.get(name)
+        if match is not None:
+            return match, []
+
+        key = normalize_location(name)
+        if not key or len(key) > FUZZY_MAX_QUERY_LENGTH:
+            return None, []
+
+        candidates = list(self._by_name) + [alias for alias, target in ALIASES.items()
+                                             if len(alias) > 3 and target in self._by_name]
+        close = difflib.get_close_matches(key, candidates, n=3, cutoff=0.6)
+        if close and difflib.SequenceMatcher(None, key, close[0]).ratio() >= FUZZY_CUTOFF:
+            return self.get(close[0]), []
+
+        suggestions = []
+        for candidate in close:
+            canonical = self.get(candidate)['locationName']
+            if canonical not in suggestions:
+                suggestions.append(canonical)
+        return None, suggestions
@@ -0,0 +1,95 @@
+import os
+from functions.ingres_cache import Snapshot, get_snapshot, location_payload, country_payload, INDIA_UUID, CACHE_TTL
+from functions.history_store import assessment_year
+
+CHILD_TYPES = {'COUNTRY' : 'STATE', 'STATE' : 'DISTRICT', 'DISTRICT' : 'BLOCK'}
+NODE_TTL = {
+    'COUNTRY' : CACHE_TTL,
+    'STATE' : float(os.getenv('INGRES_STATE_TTL', '3600')),
+    'DISTRICT' : float(os.getenv('INGRES_DISTRICT_TTL', '3600')),
+}
+UUID_KEYS = ('locationUUID', 'locationUuid', 'uuid', 'locuuid')
+
+
+def record_uuid(record : dict) -> str | None:
+    return next((record[key] for key in UUID_KEYS if record.get(key)), None)
+
+
+class LocationNode:
+    """
+    One place in the INGRES admin hierarchy (country, state, district or block).
+
+    A node only knows how to ask for its own children; the children of every node are a
+    separate INGRES request cached under its own payload with the TTL of the node's level.
+    """
+
+    __slots__ = ('name', 'loctype', 'uuid', 'parent_uuid', 'state_uuid', 'record', 'snapshot')
+
+    def __init__(self, name : str, loctype : str, uuid : str, parent_uuid : str, state_uuid : str | None,
+                 record : dict | None = None, snapshot : Snapshot | None = None):
+        self.name = name
+        self.loctype = loctype
+        self.uuid = uuid
+        self.parent_uuid = parent_uuid
+        self.state_uuid = state_uuid
+        self.record = record
+        # The parent's children response `record` was read from; tells whether it is stale.
+        self.snapshot = snapshot
+
+    def child_payload(self, year : int) -> dict:
+        if self.loctype == 'COUNTRY':
+            return country_payload(assessment_year(year))
+        return location_payload(self.name, self.loctype, self.uuid, self.parent_uuid, self.state_uuid, assessment_year(year))
+
+    async def children(self, year : int) -> Snapshot | None:
+        if self.loctype not in CHILD_TYPES:
+            return None
+        return await get_snapshot(self.child_payload(year), ttl=NODE_TTL[self.loctype])
+
+    async def child(self, name : str, year : int) -> tuple['LocationNode | None', list[str], bool]:
+        """
+        Resolve the child called `name`. Returns `(node, suggestions, fetched)` where `fetched`
+        is False when the children could not be downloaded at all.
+        """
+        snapshot = await self.children(year)
+        if snapshot is None:
+            return None, [], False
+
+        record, suggestions = snapshot.locations.resolve(name)
+        if record is None:
+            return None, suggestions, True
+
+        child_type = CHILD_TYPES[self.loctype]
+        state_uuid = self.state_uuid
+        if child_type == 'STATE':
+            state_uuid = record_uuid(record)
+        node = LocationNode(record['locationName'], child_type, record_uuid(record), self.uuid, state_uuid, record, snapshot)
+        return node, [], True
+
+
+def country_node() -> LocationNode:
+    return LocationNode('INDIA', 'COUNTRY', INDIA_UUID, INDIA_UUID, None)
+
+
+async def resolve_path(year : int, *names : str) -> tuple[LocationNode | None, dict]:
+    """
+    Walk from the country down through `names` (state, district, block), loading only the
+    levels on that path. On failure the second value is the tool error response.
+    """
+    node = country_node()
+    for name in names:
+        if node.loctype != 'COUNTRY' and not node.uuid:
+            return None, {'success' : False,
+                          'message' : f'Sub-level data not available for {node.name}'}
+
+        child, suggestions, fetched = await node.child(name, year)
+        if not fetched:
+            return None, {'success' : False,
+                          'message' : 'API request failed'}
+        if child is None:
+            level = CHILD_TYPES[node.loctype].lower()
+            return None, {'success' : False,
+                          'message' : f'{level.capitalize()} data not available for {name} in {node.name}',
+                          'did_you_mean' : suggestions}
+        node = child
+    return node, {}
@@ -0,0 +1,88 @@
+import httpx
+import functools
+from functions.history_store import get_year_snapshot, is_supported_year
+from functions.ingres_cache import stale_notice
+from functions.metric_registry import METRIC_GROUPS
+from functions.metric_table import lookup_path
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def project(group : dict, record : dict, fields : list[str] | None = None) -> dict:
+    """Pick `fields` (all of the group's fields when omitted) out of one INGRES location record."""
+    keys = fields or list(group['fields'])
+    return {key : lookup_path(record, group['fields'][key]) for key in keys}
+
+
+async def guard_tool(name : str, call) -> dict:
+    """
+    Await `call` and turn any error into the failure dict every tool returns, so the agent gets
+    a message to work with instead of an exception.
+    """
+    try:
+        return await call
+    except httpx.TimeoutException:
+        return {
+            'success': False,
+            'message': 'API request timed out. Please try again.'
+        }
+    except httpx.HTTPError as e:
+        logger.error(f"Request error: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Network error: {str(e)}'
+        }
+    except Exception as e:
+        logger.error(f"Unexpected error in {name}: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Unexpected error occurred: {str(e)}'
+        }
+
+
+def tool_errors(func):
+    """Decorator applying `guard_tool` to an async tool body; put it under `@tool`."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await guard_tool(func.__name__, func(*args, **kwargs))
+    return wrapper
+
+
+async def extract_metric(name : str, state : str, year : int, fields : list[str] | None = None) -> dict:
+    """
+    Shared body of every metric tool: resolve `state` in the `year` snapshot and return the
+    requested fields of metric group `name`.
+    """
+    group = METRIC_GROUPS[name]
+    return await guard_tool(group['tool'], _extract_metric(group, state, year, fields))
+
+
+async def _extract_metric(group : dict, state : str, year : int, fields : list[str] | None) -> dict:
+    unknown = [field for field in fields or [] if field not in group['fields']]
+    if unknown:
+        return {'success' : False,
+                'message' : f"Unknown field {', '.join(unknown)}. Use any of {', '.join(group['fields'])}"}
+
+    if not is_supported_year(year):
+        return {"success" : False,
+                "message" : f"Data not available for year {year}"}
+
+    snapshot = await get_year_snapshot(year)
+    if snapshot is None:
+        return {'success' : False,
+                'message' : 'API request failed'}
+
+    match, suggestions = snapshot.locations.resolve(state.upper().strip())
+    if not match:
+        return {'success' : False,
+                'message' : 'State data not available',
+                'did_you_mean' : suggestions}
+
+    return {
+        'success' : True,
+        'message' : group['message'].format(state=match['locationName']),
+        'data' : project(group, match, fields),
+        **stale_notice(snapshot)
+    }
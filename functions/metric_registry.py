@@ -0,0 +1,109 @@
+FOUR_WAY = ('poor_quality', 'total', 'command', 'non_command')
+
+
+def _four_way(section : str) -> dict:
+    return {'poor quality' if part == 'poor_quality' else part : f'{section}.{part}' for part in FOUR_WAY}
+
+
+# One entry per metric tool: which fields of an INGRES location record it exposes and what they mean.
+# Field definitions are sent to the model once, in the system prompt, not with every tool result.
+METRIC_GROUPS = {
+    'overall_recharge' : {
+        'tool' : 'get_overallrechargeData',
+        'title' : 'Overall groundwater recharge',
+        'unit' : 'hectare-meter',
+        'message' : 'The groundwater recharge overall recharge of state {state} is fetched the unit of data is hectare-meter',
+        'fields' : {source : f'rechargeData.{source}.total' for source in (
+            'agriculture', 'pipeline', 'rainfall', 'total', 'surface_irrigation', 'gw_irrigation',
+            'water_body', 'canal', 'sewage', 'artificial_structure')},
+        'definitions' : {
+            'agriculture' : 'Recharge due to irrigation water percolating',
+            'pipeline' : 'recharge due to leaked pipeline',
+            'rainfall' : 'Recharge due to rainwater seeping into ground',
+            'total' : 'Overall groundwater recharge due to all factor combined',
+            'surface_irrigation' : 'Recharge due to field irrigation',
+            'gw_irrigation' : 'Recharge of groundwater due to itself seeping in',
+            'water_body' : 'Recharge due to lake, river water seeping in',
+            'canal' : 'Recharge of groundwater due to canal seepage',
+            'sewage' : 'Recharge due to sewage water',
+            'artificial_structure' : 'recharge due to dams, tanks etc'
+        },
+    },
+    'rainfall_recharge' : {
+        'tool' : 'get_rainfallrecharge',
+        'title' : 'Groundwater recharge from rainfall',
+        'unit' : 'hectare-meter',
+        'message' : 'The groundwater recharge by the rainfall of state {state} is fetched the unit of data is hectare-meter',
+        'fields' : _four_way('rainfall'),
+        'definitions' : {
+            'poor quality' : 'The quantiy of rainwater goes to recharge poor quality groundwater',
+            'total' : 'Net total recharge of Groundwater',
+            'command' : 'The rainwater which goes to recharge the groundwater of irrigated areas',
+            'non command' : 'The rainwater which goes to recharge the groundwater of non-irrigated areas'
+        },
+    },
+    'loss' : {
+        'tool' : 'get_gwlossdata',
+        'title' : 'Groundwater loss',
+        'unit' : 'hectare-meter',
+        'message' : 'The groundwater loss in due to various factors for state {state} is fetched the unit of data is hectare-meter',
+        'fields' : _four_way('loss'),
+        'definitions' : {
+            'poor quality' : 'The quantity of groundwater lost due to its poor quality',
+            'total' : 'Net of groundwater lost.',
+            'command' : 'Groundwater lost in command (irrigated) areas',
+            'non command' : 'Groundwater lost in non-command (non-irrigated) areas'
+        },
+    },
+    'block_classification' : {
+        'tool' : 'get_blockcount_classification',
+        'title' : 'Block classification by stage of extraction',
+        'unit' : 'number of blocks',
+        'message' : 'The count of blocks for state of {state} is fetched with categories safe, over_exploited, semi_critical and critical categorization made according to stage of extraction',
+        'fields' : {category : f'reportSummary.total.BLOCK.{category}' for category in (
+            'over_exploited', 'semi_critical', 'critical', 'safe')},
+        'definitions' : {
+            'Stage of Extraction' : 'The ratio of total annual groundwater extraction to net annual groundwater availability in percentage',
+            'over_exploited' : 'number of blocks whose stage of extraction is more than 100%',
+            'semi_critical' : 'number of blocks whose stage of extraction is more than 70percent but less than or equal to 90%',
+            'critical' : 'number of blocks whose stage of extraction is more than 90 percent but less than or equal to 100%',
+            'safe' : 'number of blocks whose stage of extraction is less than or equal to 70%'
+        },
+    },
+    'available_for_future_use' : {
+        'tool' : 'get_availableGWforFutureUseData',
+        'title' : 'Groundwater available for future use',
+        'unit' : 'hectare-meter',
+        'message' : 'The total available groundwater for the state {state} is fetched. The unit of data is hectare-meter',
+        'fields' : _four_way('availabilityForFutureUse'),
+        'definitions' : {
+            'poor quality' : 'The total quantity of groundwater available for future use which is of poor quality',
+            'total' : 'Total groundwater available for future use in the state. This includes both good and poor quality water',
+            'command' : 'Total groundwater available in command area, which is assessible by irrigation systems like well, canals etc',
+            'non command' : 'Total groundwater available in non-command area, which can be accessed only by private extraction methods, tube wells etc'
+        },
+    },
+    'stage_of_extraction' : {
+        'tool' : 'get_overall_stage_of_extraction',
+        'title' : 'Stage of groundwater extraction',
+        'unit' : 'percentage',
+        'message' : 'Stage of extraction for a state in various region such as command and non-command {state} is fetched. The data is in percentage %',
+        'fields' : _four_way('stageOfExtraction'),
+        'definitions' : {
+            'poor quality' : 'Percentage of groundwater extracted out of total available poor quality groundwater in the state',
+            'total' : 'Percentage of groundwater extracted out of total available groundwater in the state',
+            'command' : 'Percentage of groundwater extracted out of total available groundwater in command area (i.e area in which groundwater can be extracted by irrigation systems) in the state',
+            'non command' : 'Percentage of groundwater extracted out of total available groundwater in non-command area (i.e area in which groundwater can be extracted by private systems) in the state'
+        },
+    },
+}
+
+
+def definitions_prompt() -> str:
+    """Plain-text glossary of every metric tool's fields, for the system prompt."""
+    lines = ['DATA DEFINITIONS (fields returned by the data tools) :']
+    for group in METRIC_GROUPS.values():
+        lines.append(f"{group['tool']} - {group['title']} ({group['unit']}):")
+        for field, text in group['definitions'].items():
+            lines.append(f"  - {field}: {text}")
+    return '\n'.join(lines)
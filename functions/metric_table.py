@@ -0,0 +1,69 @@
+import numpy as np
+from functions.location_index import LocationIndex
+from functions.metric_registry import METRIC_GROUPS
+
+FIELDS = list(dict.fromkeys(path for group in METRIC_GROUPS.values() for path in group['fields'].values()))
+
+METRICS = {
+    'stage_of_extraction' : 'stageOfExtraction.total',
+    'total_recharge' : 'rechargeData.total.total',
+    'rainfall_recharge' : 'rainfall.total',
+    'loss' : 'loss.total',
+    'available_for_future_use' : 'availabilityForFutureUse.total',
+    'over_exploited_blocks' : 'reportSummary.total.BLOCK.over_exploited',
+    'critical_blocks' : 'reportSummary.total.BLOCK.critical',
+    'semi_critical_blocks' : 'reportSummary.total.BLOCK.semi_critical',
+    'safe_blocks' : 'reportSummary.total.BLOCK.safe',
+}
+
+
+def lookup_path(record : dict, path : str):
+    value = record
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def metric_key(name : str) -> str | None:
+    """Map a friendly metric name or a raw FIELDS path to its FIELDS path."""
+    key = name.strip().lower().replace(' ', '_').replace('-', '_')
+    if key in METRICS:
+        return METRICS[key]
+    return name.strip() if name.strip() in FIELDS else None
+
+
+class MetricTable:
+    """
+    One assessment year as a dense `(location, field)` float matrix with NaN for missing values.
+    """
+
+    def __init__(self, locations : list[str], values : np.ndarray):
+        self.locations = locations
+        self.values = values
+        self._field_pos = {field : i for i, field in enumerate(FIELDS)}
+        self._index = LocationIndex([{'locationName' : name, 'position' : i} for i, name in enumerate(locations)])
+
+    @classmethod
+    def from_records(cls, records : list[dict]) -> 'MetricTable':
+        records = [item for item in records if item.get('locationName')]
+        values = np.array([[to_float(lookup_path(item, field)) for field in FIELDS] for item in records], dtype=float)
+        return cls([item['locationName'] for item in records], values.reshape(len(records), len(FIELDS)))
+
+    def resolve(self, name : str) -> tuple[int | None, list[str]]:
+        match, suggestions = self._index.resolve(name)
+        return (match['position'], []) if match else (None, suggestions)
+
+    def column(self, field : str) -> np.ndarray:
+        return self.values[:, self._field_pos[field]]
+
+    def columns(self, fields : list[str]) -> np.ndarray:
+        return self.values[:, [self._field_pos[field] for field in fields]]
@@ -0,0 +1,64 @@
+import time
+import asyncio
+import logging
+from collections import deque
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    __slots__ = ('task', 'started', 'waiters')
+
+    def __init__(self, task : asyncio.Future, started : float):
+        self.task = task
+        self.started = started
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key starts the coroutine as a task; every caller arriving while
+    it is still running awaits that same task and receives its result (or exception).
+    A caller being cancelled never cancels the shared task.
+    """
+
+    def __init__(self, name : str, history : int = 64):
+        self.name = name
+        self._flights = {}
+        self._recent = deque(maxlen=history)
+        self._stats = {'flights' : 0, 'coalesced' : 0}
+
+    async def do(self, key, fn, *args, **kwargs):
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(fn(*args, **kwargs)), time.perf_counter())
+            flight.task.add_done_callback(lambda task, key=key: self._finish(key))
+            self._stats['flights'] += 1
+        else:
+            flight.waiters += 1
+            self._stats['coalesced'] += 1
+        return await asyncio.shield(flight.task)
+
+    def _finish(self, key):
+        flight = self._flights.pop(key)
+        failed = flight.task.cancelled() or flight.task.exception() is not None
+        self._recent.append({'key' : key,
+                             'deduplicated' : flight.waiters,
+                             'duration' : time.perf_counter() - flight.started,
+                             'failed' : failed})
+        if flight.waiters:
+            logger.info(f"{self.name}: fetch shared with {flight.waiters} deduplicated caller(s)")
+
+    def __contains__(self, key) -> bool:
+        return key in self._flights
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> dict:
+        return {**self._stats,
+                'in_flight' : len(self._flights),
+                'recent' : list(self._recent)}
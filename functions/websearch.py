@@ -1,11 +1,104 @@
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain.tools import Tool
+import os
+import re
+import asyncio
+import hashlib
+import logging
+import threading
+from cachetools import TTLCache
+from functions.singleflight import SingleFlight
+from functions.http_client import get_http_client
 
-search = DuckDuckGoSearchRun()
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-search_tool = Tool(
-    name='search',
-    func=search.run,
-    description='Search the web for information'
-)
+# Search backend, cache and cleanup for the `search_web` tool in get_websearch.py.
+# Empty WEBSEARCH_URL searches DuckDuckGo; otherwise GET {WEBSEARCH_URL}?q=...&max_results=...
+# must return a JSON list of {title, snippet, link} (see bench/fake_search.py).
+SEARCH_URL = os.getenv('WEBSEARCH_URL', '')
+SEARCH_TIMEOUT = float(os.getenv('WEBSEARCH_TIMEOUT', '3'))
+SEARCH_CACHE_TTL = float(os.getenv('WEBSEARCH_CACHE_TTL', '3600'))
+MAX_RESULTS = int(os.getenv('WEBSEARCH_MAX_RESULTS', '5'))
+SNIPPET_CHARS = int(os.getenv('WEBSEARCH_SNIPPET_CHARS', '300'))
+TOTAL_CHARS = int(os.getenv('WEBSEARCH_TOTAL_CHARS', '1200'))
 
+_backend = None
+_cache = TTLCache(maxsize=int(os.getenv('WEBSEARCH_CACHE_SIZE', '512')), ttl=SEARCH_CACHE_TTL)
+_lock = threading.Lock()
+_flights = SingleFlight('websearch')
+_stats = {'searches' : 0, 'cache_hits' : 0, 'timeouts' : 0, 'failures' : 0, 'duplicates_dropped' : 0}
+
+
+def record_outcome(outcome : str):
+    with _lock:
+        _stats[outcome] += 1
+
+
+def normalize_search(query : str) -> str:
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', query.lower())).strip()
+
+
+def _get_backend():
+    """DuckDuckGo client, created on the first search rather than at import."""
+    global _backend
+    if _backend is None:
+        from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+        _backend = DuckDuckGoSearchAPIWrapper(max_results=MAX_RESULTS)
+    return _backend
+
+
+async def _raw_search(query : str) -> list[dict]:
+    if SEARCH_URL:
+        response = await get_http_client().get(SEARCH_URL, params={'q' : query, 'max_results' : MAX_RESULTS},
+                                               timeout=SEARCH_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    # The DuckDuckGo client is blocking; on a deadline the worker thread is abandoned, not awaited.
+    return await asyncio.to_thread(_get_backend().results, query, MAX_RESULTS * 2)
+
+
+def _clean(results : list[dict]) -> list[dict]:
+    """Drop repeated links and near-identical snippets, then trim to the per-result and total budgets."""
+    cleaned, links, texts = [], set(), set()
+    budget = TOTAL_CHARS
+    for item in results:
+        link = str(item.get('link') or item.get('href') or '').split('#')[0].rstrip('/')
+        snippet = re.sub(r'\s+', ' ', str(item.get('snippet') or item.get('body') or '')).strip()
+        if not snippet:
+            continue
+        fingerprint = hashlib.sha1(normalize_search(snippet)[:160].encode()).hexdigest()
+        if (link and link in links) or fingerprint in texts:
+            with _lock:
+                _stats['duplicates_dropped'] += 1
+            continue
+        links.add(link)
+        texts.add(fingerprint)
+        snippet = snippet[:min(SNIPPET_CHARS, budget)]
+        budget -= len(snippet)
+        cleaned.append({'title' : str(item.get('title') or '')[:120], 'snippet' : snippet, 'link' : link})
+        if len(cleaned) >= MAX_RESULTS or budget <= 0:
+            break
+    return cleaned
+
+
+async def _search(key : str, query : str) -> list[dict]:
+    results = _clean(await asyncio.wait_for(_raw_search(query), SEARCH_TIMEOUT))
+    with _lock:
+        _stats['searches'] += 1
+        _cache[key] = results
+    return results
+
+
+async def cached_search(query : str) -> list[dict]:
+    """Search results for `query`, served from cache when the normalized query was seen recently."""
+    key = normalize_search(query)
+    with _lock:
+        results = _cache.get(key)
+        if results is not None:
+            _stats['cache_hits'] += 1
+            return results
+    return await _flights.do(key, _search, key, query)
+
+
+def get_search_stats() -> dict:
+    with _lock:
+        return {**_stats, 'cached_queries' : len(_cache), 'coalescing' : _flights.stats()}
@@ -0,0 +1,176 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from cachetools import TTLCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HISTORY_TOKEN_BUDGET = int(os.getenv('HISTORY_TOKEN_BUDGET', '2000'))
+SUMMARY_TOKEN_BUDGET = int(os.getenv('HISTORY_SUMMARY_TOKENS', str(HISTORY_TOKEN_BUDGET // 4)))
+MAX_RECENT_TURNS = int(os.getenv('HISTORY_RECENT_TURNS', '6'))
+TOOL_ROLES = {'tool', 'function'}
+
+SUMMARY_PROMPT = '''Summarize the conversation below between a user and NEERMITRA, a groundwater data assistant.
+Keep every state, district, year, metric and number that was asked about or answered, and any preference the user stated.
+Write at most {words} words of plain text.
+
+{previous}Conversation:
+{conversation}'''
+
+_summaries = TTLCache(maxsize=int(os.getenv('HISTORY_SUMMARY_CACHE_SIZE', '512')), ttl=3600)
+_lock = threading.Lock()
+_summarizer = None
+_stats = {'compacted' : 0, 'summaries' : 0, 'summary_cache_hits' : 0, 'summary_failures' : 0, 'dropped_tool_payloads' : 0}
+
+
+def estimate_tokens(text : str) -> int:
+    return len(text) // 4 + 1
+
+
+def set_summarizer(llm):
+    global _summarizer
+    _summarizer = llm
+
+
+def _get_summarizer():
+    global _summarizer
+    if _summarizer is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        _summarizer = ChatGoogleGenerativeAI(model='gemini-2.0-flash', temperature=0)
+    return _summarizer
+
+
+def _role(turn : dict) -> str:
+    return str(turn.get('role') or turn.get('type') or 'user')
+
+
+def _content(turn : dict) -> str:
+    return str(turn.get('content') or '')
+
+
+def _is_tool_payload(turn : dict) -> bool:
+    if _role(turn) in TOOL_ROLES:
+        return True
+    content = _content(turn).strip()
+    if not content.startswith('{'):
+        return False
+    try:
+        return 'success' in json.loads(content)
+    except ValueError:
+        return False
+
+
+def _truncate(text : str, tokens : int) -> str:
+    limit = tokens * 4
+    return text if len(text) <= limit else text[:limit].rstrip() + ' ...'
+
+
+def _summary_keys(turns : list[dict]) -> list[str]:
+    """
+    Cache key of a summary ending at each turn. Stored sessions give every turn a stable `id`, so a
+    summary stays reusable after the session trims its oldest turns; other histories chain a
+    content hash from the first turn.
+    """
+    if all(turn.get('id') for turn in turns):
+        return [f"id:{turn['id']}" for turn in turns]
+    hashes = []
+    digest = ''
+    for turn in turns:
+        digest = hashlib.sha1(f"{digest}\x00{_role(turn)}\x00{_content(turn)}".encode()).hexdigest()
+        hashes.append(digest)
+    return hashes
+
+
+def _message(turn : dict) -> dict:
+    return {key : value for key, value in turn.items() if key != 'id'}
+
+
+def _fallback_summary(turns : list[dict], tokens : int) -> str:
+    questions = [_content(turn) for turn in turns if _role(turn) in ('user', 'human')]
+    return _truncate('Earlier the user asked: ' + ' | '.join(questions), tokens)
+
+
+async def _summarize(turns : list[dict], tokens : int) -> str:
+    """Rolling summary of `turns`, extending the latest summary already made for part of them."""
+    hashes = _summary_keys(turns)
+    with _lock:
+        summary = _summaries.get(hashes[-1])
+        if summary is not None:
+            _stats['summary_cache_hits'] += 1
+            return summary
+        start, previous = 0, None
+        for i in range(len(hashes) - 2, -1, -1):
+            previous = _summaries.get(hashes[i])
+            if previous is not None:
+                start = i + 1
+                break
+
+    conversation = '\n'.join(f"{_role(turn)}: {_content(turn)}" for turn in turns[start:])
+    prompt = SUMMARY_PROMPT.format(words=max(tokens * 3 // 4, 20),
+                                   previous=f"Summary so far:\n{previous}\n\n" if previous else '',
+                                   conversation=conversation)
+    try:
+        response = await _get_summarizer().ainvoke(prompt)
+        summary = _truncate(str(response.content).strip(), tokens)
+    except Exception as e:
+        logger.error(f"History summarization failed: {str(e)}")
+        summary = ''
+
+    if not summary:
+        with _lock:
+            _stats['summary_failures'] += 1
+        return _fallback_summary(turns, tokens)
+
+    with _lock:
+        _stats['summaries'] += 1
+        _summaries[hashes[-1]] = summary
+    return summary
+
+
+async def compact_history(chathistory : list[dict[str,str]] | None, budget : int = HISTORY_TOKEN_BUDGET) -> list[dict[str,str]]:
+    """
+    Fit `chathistory` into `budget` tokens: tool payloads are dropped, the most recent turns are
+    kept verbatim and everything older is replaced by one cached rolling summary.
+    """
+    if not chathistory:
+        return []
+
+    turns = [turn for turn in chathistory if not _is_tool_payload(turn)]
+    dropped = len(chathistory) - len(turns)
+
+    summary_budget = min(SUMMARY_TOKEN_BUDGET, budget // 2)
+    recent_budget = budget - summary_budget
+    recent = []
+    used = 0
+    for turn in reversed(turns):
+        cost = estimate_tokens(_content(turn))
+        if recent and (used + cost > recent_budget or len(recent) >= MAX_RECENT_TURNS):
+            break
+        if not recent and cost > recent_budget:
+            turn = {**turn, 'content' : _truncate(_content(turn), recent_budget)}
+            cost = recent_budget
+        recent.insert(0, turn)
+        used += cost
+
+    older = turns[:len(turns) - len(recent)]
+    recent = [_message(turn) for turn in recent]
+    with _lock:
+        _stats['dropped_tool_payloads'] += dropped
+        if older:
+            _stats['compacted'] += 1
+    if not older:
+        return recent
+
+    summary = await _summarize(older, summary_budget)
+    return [{'role' : 'system', 'content' : f"Summary of the earlier conversation: {summary}"}] + recent
+
+
+def get_history_stats() -> dict:
+    with _lock:
+        return {**_stats,
+                'budget_tokens' : HISTORY_TOKEN_BUDGET,
+                'summary_tokens' : SUMMARY_TOKEN_BUDGET,
+                'cached_summaries' : len(_summaries)}
@@ -0,0 +1,203 @@
+import re
+import logging
+import threading
+from collections import Counter
+from functions.location_index import ALIASES, STATE_NAMES, normalize_location
+from functions.history_store import MAX_YEAR
+from functions.metric_engine import extract_metric
+from functions.metric_registry import METRIC_GROUPS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_LENGTH = 160
+
+# Checked in order; the first pattern of a metric family that matches claims it. `name` is the METRIC_GROUPS key.
+INTENTS = [
+    {
+        'name' : 'block_classification',
+        # Only when blocks are asked about: a bare "critical" or "safe" is a judgement for the agent.
+        'pattern' : re.compile(r'\bblocks?\b'),
+        'title' : 'Block classification by stage of extraction in {state} ({year})',
+        'column' : 'Number of blocks',
+    },
+    {
+        'name' : 'stage_of_extraction',
+        'pattern' : re.compile(r'stage of (ground ?water )?extraction|extraction stage|\bsoe\b|extraction (level|percentage|rate)'),
+        'title' : 'Stage of groundwater extraction in {state} ({year})',
+        'column' : 'Stage of extraction (%)',
+    },
+    {
+        'name' : 'rainfall_recharge',
+        'pattern' : re.compile(r'rain ?fall recharge|recharge (from|by|due to|through) rain'),
+        'title' : 'Groundwater recharge from rainfall in {state} ({year})',
+        'column' : 'Recharge (ham)',
+    },
+    {
+        'name' : 'overall_recharge',
+        'pattern' : re.compile(r'\brecharge\b'),
+        'title' : 'Groundwater recharge by source in {state} ({year})',
+        'column' : 'Recharge (ham)',
+    },
+    {
+        'name' : 'loss',
+        'pattern' : re.compile(r'\bloss(es)?\b|\blost\b'),
+        'title' : 'Groundwater loss in {state} ({year})',
+        'column' : 'Loss (ham)',
+    },
+    {
+        'name' : 'available_for_future_use',
+        'pattern' : re.compile(r'future use|availab(le|ility)'),
+        'title' : 'Groundwater available for future use in {state} ({year})',
+        'column' : 'Available (ham)',
+    },
+]
+
+# Anything asking for reasoning, comparison or context from earlier turns goes to the agent.
+# Existential "there" ("how many blocks are there in X") is not a back-reference and is left out.
+AGENT_ONLY = re.compile(
+    r'\b(why|how (can|to|do|should)|explain|compare|comparison|versus|vs|trend|between|suggest|recommend|should|'
+    r'improve|reason|cause|impact|predict|forecast|rank|highest|lowest|top|most|least|it|its|that|same|'
+    r'district|block of|village|city)\b'
+)
+YEAR = re.compile(r'\b(20[1-3]\d)\b')
+# Assessment years written as a span ("2024-25", "2023-2024") are named by their end year.
+YEAR_RANGE = re.compile(r'\b(20[1-3]\d)\s*[-\u2013/]\s*((?:20)?\d\d)\b')
+
+_state_keys = {normalize_location(name) : name for name in STATE_NAMES}
+_alias_keys = {alias : target for alias, target in ALIASES.items() if target in STATE_NAMES}
+_lock = threading.Lock()
+_stats = Counter()
+
+
+def _record(decision : str):
+    with _lock:
+        _stats[decision] += 1
+
+
+def find_states(query : str) -> list[str]:
+    tokens = re.findall(r"[A-Za-z&]+", query)
+    found = []
+    i = 0
+    while i < len(tokens):
+        for n in range(min(7, len(tokens) - i), 0, -1):
+            words = tokens[i:i + n]
+            key = normalize_location(' '.join(words))
+            state = _state_keys.get(key)
+            if state is None and key in _alias_keys:
+                if len(key) > 3 or all(word.isupper() for word in words):
+                    state = _alias_keys[key]
+            if state is not None:
+                if state not in found:
+                    found.append(state)
+                i += n
+                break
+        else:
+            i += 1
+    return found
+
+
+def find_intents(query : str) -> list[dict]:
+    lowered = query.lower()
+    matched = [intent for intent in INTENTS if intent['pattern'].search(lowered)]
+    names = {intent['name'] for intent in matched}
+    if 'rainfall_recharge' in names:
+        matched = [intent for intent in matched if intent['name'] != 'overall_recharge']
+    if 'block_classification' in names and 'stage_of_extraction' in names and re.search(r'\bblocks?\b', lowered):
+        matched = [intent for intent in matched if intent['name'] != 'stage_of_extraction']
+    return matched
+
+
+def find_years(query : str) -> set[int] | None:
+    """Years named in `query`, spans mapped to their end year; None when a span is not one assessment year."""
+    years = set()
+    for start, end in YEAR_RANGE.findall(query):
+        end = int(end) if len(end) == 4 else int(start[:2] + end)
+        if end != int(start) + 1:
+            return None
+        years.add(end)
+    return years | {int(year) for year in YEAR.findall(YEAR_RANGE.sub(' ', query))}
+
+
+def classify(query : str) -> tuple[dict | None, str | None, int | None, str]:
+    """
+    Decide whether `query` is a single-metric, single-state lookup.
+
+    Returns `(intent, state, year, decision)`; intent is None when the agent must answer,
+    with `decision` naming the reason.
+    """
+    if len(query) > MAX_QUERY_LENGTH:
+        return None, None, None, 'too_long'
+    if AGENT_ONLY.search(query.lower()):
+        return None, None, None, 'needs_reasoning'
+
+    intents = find_intents(query)
+    if not intents:
+        return None, None, None, 'no_metric'
+    if len(intents) > 1:
+        return None, None, None, 'multiple_metrics'
+
+    states = find_states(query)
+    if not states:
+        return None, None, None, 'no_state'
+    if len(states) > 1:
+        return None, None, None, 'multiple_states'
+
+    years = find_years(query)
+    if years is None:
+        return None, None, None, 'ambiguous_year'
+    if len(years) > 1:
+        return None, None, None, 'multiple_years'
+    year = years.pop() if years else MAX_YEAR
+
+    return intents[0], states[0], year, 'routed'
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool) or value is None:
+        return 'N/A'
+    if isinstance(value, (int, float)):
+        return f'{value:,.2f}'.rstrip('0').rstrip('.') if isinstance(value, float) else f'{value:,}'
+    return str(value)
+
+
+def render_answer(intent : dict, state : str, year : int, result : dict) -> str:
+    lines = [f"### {intent['title'].format(state=state.title(), year=year)}", '',
+             f"| Category | {intent['column']} |", '|---|---|']
+    for key, value in result['data'].items():
+        lines.append(f"| {key.replace('_', ' ').capitalize()} | {_format_value(value)} |")
+    if result.get('stale'):
+        lines.extend(['', f"_{result['note']} (as of {result['as_of']})._"])
+    definitions = METRIC_GROUPS[intent['name']]['definitions']
+    if definitions:
+        lines.append('')
+        for key, text in definitions.items():
+            lines.append(f"- **{key.replace('_', ' ').capitalize()}**: {text}")
+    return '\n'.join(lines)
+
+
+async def route_query(query : str) -> str | None:
+    """Answer `query` from the tools without the LLM when it is confidently a simple lookup, else None."""
+    intent, state, year, decision = classify(query)
+    if intent is None:
+        _record(decision)
+        return None
+
+    result = await extract_metric(intent['name'], state, year)
+    if not result or not result.get('success'):
+        _record('tool_failed')
+        return None
+
+    _record(f"routed:{intent['name']}")
+    _record('routed')
+    return render_answer(intent, state, year, result)
+
+
+def get_router_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    routed = stats.get('routed', 0)
+    total = routed + sum(count for decision, count in stats.items() if not decision.startswith('routed'))
+    return {'decisions' : stats,
+            'total' : total,
+            'hit_rate' : routed / total if total else 0.0}
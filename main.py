@@ -1,32 +1,279 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from chatbot import chatbot
+import os
+import hmac
+import json
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from chatbot import chatbot, chatbot_stream, get_agent_executor, agent_ready
+from functions.history_store import get_history_store
+from functions.http_client import close_http_client
+from functions.ingres_refresher import refresher
+from functions.websearch import get_search_stats
+from functions.ingres_cache import get_cache_stats, snapshot_context
+from intent_router import get_router_stats
+from answer_cache import get_answer_cache_stats
+from history_manager import get_history_stats
+from tool_executor import get_tool_stats
+from admission import admission, AdmissionRejected
+from data_api import router as data_router, get_data_api_stats
+from session_store import new_session_id, load_history, append_turns, get_session_stats
+from metrics import register_stats, render_metrics
+from timings import request_id_var, record_request
+
+
+# When to build the agent (and import the LLM stack): 'background' starts right after startup
+# so data-only requests are served meanwhile, 'eager' before accepting requests, 'lazy' on first use.
+AGENT_WARMUP = os.getenv('AGENT_WARMUP', 'background')
+
+
+async def _warm_agent():
+    try:
+        await asyncio.to_thread(get_agent_executor)
+    except Exception as e:
+        logger.error(f"Agent warm-up failed, it will be built on first use: {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app : FastAPI):
+    warmup = None
+    if AGENT_WARMUP == 'eager':
+        await asyncio.to_thread(get_agent_executor)
+    elif AGENT_WARMUP == 'background':
+        warmup = asyncio.create_task(_warm_agent())
+    await asyncio.to_thread(get_history_store)
+    refresher.start()
+    yield
+    await refresher.stop()
+    if warmup is not None:
+        await warmup
+    await close_http_client()
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = int(os.getenv('CHAT_BATCH_CONCURRENCY', '8'))
+BATCH_MAX_ITEMS = int(os.getenv('CHAT_BATCH_MAX_ITEMS', '500'))
+# Reverse proxies in front of the app that append to X-Forwarded-For; Vercel's edge is one.
+TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', '1' if os.getenv('VERCEL') else '0'))
+# Callers presenting this in X-Client-Auth may name the client they act for in X-Client-ID.
+CLIENT_ID_SECRET = os.getenv('CLIENT_ID_SECRET', '')
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(data_router)
+
+register_stats('router', get_router_stats)
+register_stats('answer_cache', get_answer_cache_stats)
+register_stats('ingres_cache', get_cache_stats)
+register_stats('history', get_history_stats)
+register_stats('tools', get_tool_stats)
+register_stats('sessions', get_session_stats)
+register_stats('admission', admission.stats)
+register_stats('data_api', get_data_api_stats)
+register_stats('websearch', get_search_stats)
+register_stats('ingres_refresh', refresher.status)
+
+
+@app.middleware('http')
+async def request_context(request : Request, call_next):
+    request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    route = request.scope.get('route')
+    record_request(route.path if route else 'unmatched', response.status_code, time.perf_counter() - started)
+    response.headers['X-Request-ID'] = request_id
+    return response
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request : Request, error : AdmissionRejected):
+    return JSONResponse(status_code=error.status,
+                        content={'success' : False, 'message' : error.message},
+                        headers={'Retry-After' : str(error.retry_after)})
+
+
+def _client_id(request : Request) -> str:
+    """
+    Identity used for the per-client limit. Only values the client cannot choose count: X-Client-ID
+    from an authenticated caller, else the address our trusted proxies saw, else the peer address.
+    """
+    client_id = request.headers.get('X-Client-ID')
+    auth = request.headers.get('X-Client-Auth', '')
+    if client_id and CLIENT_ID_SECRET and hmac.compare_digest(auth.encode(), CLIENT_ID_SECRET.encode()):
+        return f'id:{client_id}'
+
+    if TRUSTED_PROXY_HOPS:
+        # Each trusted proxy appends the address it received from; earlier entries are client-supplied.
+        hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else 'unknown'
+
+
+def _gate(request : Request):
+    client = _client_id(request)
+    return lambda: admission.slot(client)
 
-app = FastAPI()
 
 class ChatRequest(BaseModel):
     query : str
+    session_id : str|None = Field(default=None, pattern=r'^[A-Za-z0-9_-]{1,64}$')
+    # Only used to seed a new session; the server keeps the history from then on.
     chat_history : list[dict[str,str]]|None = None
+
+
+async def _session_history(request : ChatRequest) -> tuple[str, list[dict[str,str]]]:
+    session_id = request.session_id or new_session_id()
+    history = await load_history(session_id)
+    if not history and request.chat_history:
+        history = request.chat_history
+        await append_turns(session_id, history)
+    return session_id, history
+
+
+async def _remember(session_id : str, query : str, answer : str | None):
+    if answer:
+        await append_turns(session_id, [{'role' : 'user', 'content' : query},
+                                        {'role' : 'assistant', 'content' : answer}])
+
+
+class BatchChatRequest(BaseModel):
+    items : list[ChatRequest]
+    concurrency : int|None = None
  
 @app.get('/')
 def read_root():
     return {"success" : True,
             "message" : "Server is running!"}
 
+@app.get('/metrics')
+def read_metrics(request : Request):
+    body, content_type = render_metrics(request.headers.get('Accept', ''))
+    return Response(content=body, media_type=content_type)
+
+@app.get('/stats')
+def read_stats():
+    return {'success' : True,
+            'agent_ready' : agent_ready(),
+            'router' : get_router_stats(),
+            'answer_cache' : get_answer_cache_stats(),
+            'history' : get_history_stats(),
+            'tools' : get_tool_stats(),
+            'sessions' : get_session_stats(),
+            'admission' : admission.stats(),
+            'data_api' : get_data_api_stats(),
+            'websearch' : get_search_stats(),
+            'ingres_refresh' : refresher.status(),
+            'ingres_cache' : get_cache_stats()}
+
 @app.post('/chat')
-def handle_chat(request : ChatRequest):
+async def handle_chat(request : ChatRequest, http_request : Request):
     if not request or not request.query:
         return {'success' : False,
                 'message' : 'User query required'}
     
-    ai_response = chatbot(request.query, request.chat_history)
+    session_id, history = await _session_history(request)
+    ai_response = await chatbot(request.query, history, _gate(http_request))
 
     if not ai_response:
         return {'success' : False,
                 'message' : "Error getting ai reponse"}
-    
+
+    await _remember(session_id, request.query, ai_response.get('output'))
     return {'success' : True,
             'message' : "ai reponse fetched successfully",
-            'response' : ai_response}
+            'session_id' : session_id,
+            'response' : {'output' : ai_response.get('output')}}
+
+
+def _sse(event : str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post('/chat/stream')
+async def handle_chat_stream(request : ChatRequest, http_request : Request):
+    if not request or not request.query:
+        return {'success' : False,
+                'message' : 'User query required'}
+
+    admission.check(_client_id(http_request))
+    session_id, history = await _session_history(request)
+    gate = _gate(http_request)
+
+    async def events():
+        try:
+            async for event, data in chatbot_stream(request.query, history, gate):
+                if event == 'answer':
+                    await _remember(session_id, request.query, data.get('output'))
+                yield _sse(event, data)
+        except AdmissionRejected as e:
+            yield _sse('error', {'message' : e.message, 'status' : e.status})
+        except Exception as e:
+            logger.error(f"Error streaming ai response: {str(e)}")
+            yield _sse('error', {'message' : "Error getting ai reponse"})
+        yield _sse('done', {'session_id' : session_id})
+
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control' : 'no-cache', 'X-Accel-Buffering' : 'no'})
+
+
+@app.post('/chat/batch')
+async def handle_chat_batch(request : BatchChatRequest, http_request : Request):
+    """
+    Answer many queries in one call. Items run concurrently (at most `concurrency`, capped by
+    CHAT_BATCH_CONCURRENCY and the per-client agent limit) against one shared data snapshot, and each result is streamed as a
+    `result` event with its `index` as soon as it completes; a failing item only fails itself.
+    """
+    if not request.items:
+        return {'success' : False,
+                'message' : 'At least one item required'}
+    if len(request.items) > BATCH_MAX_ITEMS:
+        return {'success' : False,
+                'message' : f"At most {BATCH_MAX_ITEMS} items per batch"}
+
+    slots = asyncio.Semaphore(max(1, min(request.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY, admission.per_client)))
+    gate = _gate(http_request)
+    context = snapshot_context()
+
+    async def answer(index : int, item : ChatRequest) -> dict:
+        if not item.query:
+            return {'index' : index, 'success' : False, 'message' : 'User query required'}
+        async with slots:
+            try:
+                session_id, history = await _session_history(item)
+                ai_response = await chatbot(item.query, history, gate)
+                await _remember(session_id, item.query, (ai_response or {}).get('output'))
+            except AdmissionRejected as e:
+                return {'index' : index, 'success' : False, 'message' : e.message, 'status' : e.status}
+            except Exception as e:
+                logger.error(f"Error getting ai response for batch item {index}: {str(e)}")
+                ai_response = None
+        if not ai_response:
+            return {'index' : index, 'success' : False, 'message' : "Error getting ai reponse"}
+        return {'index' : index, 'success' : True, 'session_id' : session_id,
+                'response' : {'output' : ai_response.get('output')}}
 
+    async def events():
+        tasks = [asyncio.create_task(answer(index, item), context=context.copy())
+                 for index, item in enumerate(request.items)]
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                failed += not result['success']
+                yield _sse('result', result)
+        finally:
+            for task in tasks:
+                task.cancel()
+        yield _sse('done', {'total' : len(tasks), 'failed' : failed})
 
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control' : 'no-cache', 'X-Accel-Buffering' : 'no'})
@@ -0,0 +1,38 @@
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.openmetrics.exposition import CONTENT_TYPE_LATEST as OPENMETRICS_CONTENT_TYPE
+from prometheus_client.openmetrics.exposition import generate_latest as generate_openmetrics
+
+_providers = {}
+
+
+def register_stats(name : str, provider):
+    """Export every numeric value of `provider()` as a `neermitra_<name>_<key>` gauge at scrape time."""
+    _providers[name] = provider
+
+
+def _flatten(prefix : str, value):
+    if isinstance(value, bool):
+        yield prefix, float(value)
+    elif isinstance(value, (int, float)):
+        yield prefix, float(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(f'{prefix}_{key}', item)
+
+
+class StatsCollector:
+    def collect(self):
+        for name, provider in _providers.items():
+            for key, value in _flatten(f'neermitra_{name}', provider()):
+                metric = ''.join(char if char.isalnum() or char == '_' else '_' for char in key)
+                yield GaugeMetricFamily(metric, f'{name} statistic', value=value)
+
+
+REGISTRY.register(StatsCollector())
+
+
+def render_metrics(accept : str = '') -> tuple[bytes, str]:
+    if 'application/openmetrics-text' in accept:
+        return generate_openmetrics(REGISTRY), OPENMETRICS_CONTENT_TYPE
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
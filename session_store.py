@@ -0,0 +1,109 @@
+import os
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from cachetools import LRUCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Vercel functions can only write under /tmp.
+SESSION_DB = Path(os.getenv('SESSION_DB', Path('/tmp' if os.getenv('VERCEL') else Path(__file__).resolve().parent / 'data') / 'sessions.sqlite3'))
+SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', '1024'))
+SESSION_MAX_TURNS = int(os.getenv('SESSION_MAX_TURNS', '100'))
+
+_cache = LRUCache(maxsize=SESSION_CACHE_SIZE)
+_lock = threading.Lock()
+_db = None
+_stats = {'hits' : 0, 'misses' : 0, 'appended_turns' : 0, 'created' : 0}
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _connect() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        SESSION_DB.parent.mkdir(parents=True, exist_ok=True)
+        _db = sqlite3.connect(SESSION_DB, check_same_thread=False)
+        _db.execute('PRAGMA journal_mode=WAL')
+        _db.execute('''CREATE TABLE IF NOT EXISTS turns (
+                           session_id TEXT NOT NULL,
+                           seq INTEGER NOT NULL,
+                           role TEXT NOT NULL,
+                           content TEXT NOT NULL,
+                           created REAL NOT NULL,
+                           PRIMARY KEY (session_id, seq))''')
+        _db.commit()
+    return _db
+
+
+def _turn(session_id : str, seq : int, role : str, content : str) -> dict[str,str]:
+    # `id` stays the same when older turns are trimmed, so history_manager can key summaries on it.
+    return {'role' : role, 'content' : content, 'id' : f'{session_id}:{seq}'}
+
+
+def _load(session_id : str) -> list[dict[str,str]]:
+    with _lock:
+        turns = _cache.get(session_id)
+        if turns is not None:
+            _stats['hits'] += 1
+            return list(turns)
+        _stats['misses'] += 1
+        rows = _connect().execute('SELECT seq, role, content FROM turns WHERE session_id = ? ORDER BY seq',
+                                  (session_id,)).fetchall()
+        turns = [_turn(session_id, seq, role, content) for seq, role, content in rows]
+        _cache[session_id] = turns
+        return list(turns)
+
+
+def _append(session_id : str, turns : list[dict[str,str]]):
+    with _lock:
+        db = _connect()
+        last = db.execute('SELECT MAX(seq) FROM turns WHERE session_id = ?', (session_id,)).fetchone()[0]
+        if last is None:
+            _stats['created'] += 1
+            last = -1
+        now = time.time()
+        stored = [_turn(session_id, last + 1 + i, str(turn.get('role') or 'user'), str(turn.get('content') or ''))
+                  for i, turn in enumerate(turns)]
+        with db:
+            db.executemany('INSERT INTO turns (session_id, seq, role, content, created) VALUES (?, ?, ?, ?, ?)',
+                           [(session_id, last + 1 + i, turn['role'], turn['content'], now)
+                            for i, turn in enumerate(stored)])
+            db.execute('DELETE FROM turns WHERE session_id = ? AND seq <= ?',
+                       (session_id, last + len(turns) - SESSION_MAX_TURNS))
+        _stats['appended_turns'] += len(turns)
+        cached = _cache.get(session_id)
+        if cached is not None:
+            cached.extend(stored)
+            del cached[:-SESSION_MAX_TURNS]
+
+
+async def load_history(session_id : str) -> list[dict[str,str]]:
+    """Stored turns of `session_id`, oldest first, each with a stable `id`; empty for a new session."""
+    return await asyncio.to_thread(_load, session_id)
+
+
+async def append_turns(session_id : str, turns : list[dict[str,str]]):
+    """Add `turns` to the end of `session_id`, keeping only the last SESSION_MAX_TURNS."""
+    if turns:
+        await asyncio.to_thread(_append, session_id, turns)
+
+
+def clear_sessions():
+    with _lock:
+        _cache.clear()
+        db = _connect()
+        with db:
+            db.execute('DELETE FROM turns')
+
+
+def get_session_stats() -> dict:
+    with _lock:
+        return {**_stats, 'cached_sessions' : len(_cache)}
@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from admission import AdmissionController, AdmissionRejected
+
+
+def test_burst_is_bounded_by_capacity_plus_queue():
+    admission = AdmissionController(capacity=2, per_client=100, queue_size=2, timeout=5)
+    outcomes = []
+
+    async def request(i):
+        try:
+            async with admission.slot(f'client-{i}'):
+                outcomes.append('admitted')
+                await asyncio.sleep(0.05)
+        except AdmissionRejected as e:
+            outcomes.append(e.status)
+
+    async def run():
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*[request(i) for i in range(20)])
+        return asyncio.get_running_loop().time() - started
+
+    elapsed = asyncio.run(run())
+    stats = admission.stats()
+    assert outcomes.count('admitted') == 4
+    assert outcomes.count(503) == 16
+    assert stats['rejected_queue_full'] == 16
+    assert stats['rejected_timeout'] == 0
+    assert stats['running'] == stats['queued'] == 0
+    assert elapsed < 1
+
+
+def test_per_client_limit():
+    admission = AdmissionController(capacity=10, per_client=1, queue_size=10, timeout=5)
+
+    async def run():
+        async with admission.slot('a'):
+            with pytest.raises(AdmissionRejected) as rejected:
+                admission.check('a')
+            assert rejected.value.status == 429
+            admission.check('b')
+
+    asyncio.run(run())
@@ -0,0 +1,30 @@
+import pytest
+from starlette.requests import Request
+import main
+
+
+def make_request(headers : dict, peer : str = '10.0.0.9') -> Request:
+    return Request({'type' : 'http', 'headers' : [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+                    'client' : (peer, 1234)})
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    monkeypatch.setattr(main, 'TRUSTED_PROXY_HOPS', 0)
+    monkeypatch.setattr(main, 'CLIENT_ID_SECRET', 'secret')
+
+
+def test_client_chosen_headers_are_ignored():
+    request = make_request({'X-Client-ID' : 'rotating-1', 'X-Forwarded-For' : '1.2.3.4'})
+    assert main._client_id(request) == '10.0.0.9'
+
+
+def test_client_id_needs_the_shared_secret():
+    assert main._client_id(make_request({'X-Client-ID' : 'a', 'X-Client-Auth' : 'wrong'})) == '10.0.0.9'
+    assert main._client_id(make_request({'X-Client-ID' : 'a', 'X-Client-Auth' : 'secret'})) == 'id:a'
+
+
+def test_forwarded_for_uses_the_hop_appended_by_the_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(main, 'TRUSTED_PROXY_HOPS', 1)
+    request = make_request({'X-Forwarded-For' : 'spoofed, 203.0.113.7'})
+    assert main._client_id(request) == '203.0.113.7'
@@ -0,0 +1,48 @@
+import asyncio
+import numpy as np
+from bench.fake_ingres import synthetic_response
+from functions.derived_metrics import DerivedTable
+from functions.metric_table import MetricTable
+
+
+def test_national_values_are_sums_and_stage_of_extraction_is_not_invented():
+    table = MetricTable.from_records(synthetic_response('2023-2024'))
+    derived = DerivedTable(table)
+    national = derived.national_summary()
+    assert national['stage_of_extraction']['value'] is None
+    assert national['stage_of_extraction']['aggregate'] is None
+    loss = table.columns(['loss.total'])[:, 0]
+    assert national['loss']['value'] == round(float(np.nansum(loss)), 2)
+
+
+def test_rank_one_is_the_highest_value():
+    table = MetricTable.from_records(synthetic_response('2023-2024'))
+    derived = DerivedTable(table)
+    m = derived.metrics.index('loss')
+    top = int(np.nanargmax(derived.values[:, m]))
+    name, summary, _ = derived.state_summary(table.locations[top], ['loss'])
+    assert summary['loss']['rank'] == 1
+    assert summary['loss']['national'] is not None
+
+
+def test_analytics_from_a_stale_snapshot_carry_the_notice(monkeypatch):
+    from functions import derived_metrics, get_stateanalytics
+    from functions.ingres_cache import Snapshot
+    fresh = Snapshot(synthetic_response('2023-2024'), 1, 'v1')
+    snapshots = {2024 : fresh, 2023 : Snapshot(synthetic_response('2022-2023'), 1, 'v0')}
+
+    async def year_snapshot(year):
+        return snapshots[year]
+
+    monkeypatch.setattr(derived_metrics, 'get_year_snapshot', year_snapshot)
+    monkeypatch.setattr(derived_metrics, 'is_supported_year', lambda year: True)
+    monkeypatch.setattr(get_stateanalytics, 'is_supported_year', lambda year: True)
+
+    async def analytics(state):
+        return await get_stateanalytics.get_state_analytics.ainvoke({'state' : state, 'year' : 2024, 'metrics' : ['loss']})
+
+    assert 'stale' not in asyncio.run(analytics('Kerala'))
+    snapshots[2024] = fresh.as_stale()
+    for state in ('Kerala', 'India'):
+        result = asyncio.run(analytics(state))
+        assert result['success'] and result['stale'] is True and result['as_of']
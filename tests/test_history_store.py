@@ -0,0 +1,58 @@
+import os
+import copy
+import gzip
+import json
+from bench.fake_ingres import synthetic_response
+from functions import history_store
+from functions.history_store import HistoryStore
+from functions.metric_table import FIELDS, lookup_path
+
+
+def test_version_follows_the_values_not_just_the_shape():
+    records = synthetic_response('2023-2024')
+    corrected = copy.deepcopy(records)
+    *parents, leaf = FIELDS[0].split('.')
+    node = corrected[0]
+    for part in parents:
+        node = node[part]
+    node[leaf] = (lookup_path(records[0], FIELDS[0]) or 0) + 1
+
+    store = HistoryStore({2024 : records})
+    assert HistoryStore({2024 : copy.deepcopy(records)}).version == store.version
+    assert HistoryStore({2024 : corrected}).year(2024).version != store.year(2024).version
+
+
+def test_prebuilt_round_trip_keeps_the_version(tmp_path):
+    store = HistoryStore({2023 : synthetic_response('2022-2023'), 2024 : synthetic_response('2023-2024')})
+    store.save(tmp_path / 'store.npz')
+    loaded = HistoryStore.load(tmp_path / 'store.npz')
+    assert loaded.version == store.version
+    assert loaded.record('Kerala', 2024) == store.record('Kerala', 2024)
+
+
+def _write_snapshot(directory, year, records):
+    with gzip.open(directory / f'{year - 1}-{year}.json.gz', 'wt', encoding='utf-8') as f:
+        json.dump(records, f)
+
+
+def test_prebuilt_store_is_checked_against_snapshot_contents_not_mtimes(tmp_path, monkeypatch):
+    snapshots = tmp_path / 'snapshots'
+    snapshots.mkdir()
+    monkeypatch.setattr(history_store, 'SNAPSHOT_DIR', snapshots)
+    monkeypatch.setattr(history_store, 'PREBUILT_PATH', tmp_path / 'prebuilt' / 'store.npz')
+    _write_snapshot(snapshots, 2023, synthetic_response('2022-2023'))
+    _write_snapshot(snapshots, 2024, synthetic_response('2023-2024'))
+    history_store.load_store(prebuilt=False).save(history_store.PREBUILT_PATH)
+
+    # A git checkout can leave the snapshots newer than the store; that alone must not matter.
+    os.utime(history_store.PREBUILT_PATH, (0, 0))
+    assert history_store._load_prebuilt() is not None
+
+    _write_snapshot(snapshots, 2024, synthetic_response('2023-2024', names=['KERALA']))
+    assert history_store._load_prebuilt() is None
+
+    history_store.load_store(prebuilt=False).save(history_store.PREBUILT_PATH)
+    assert history_store._load_prebuilt() is not None
+    (snapshots / '2022-2023.json.gz').unlink()
+    assert history_store._load_prebuilt() is None
+    assert history_store.load_store().years == [2024]
@@ -0,0 +1,25 @@
+import asyncio
+import httpx
+from bench.fake_search import FakeSearchServer
+from functions import http_client
+
+
+def test_outbound_requests_are_recorded_including_failures(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(http_client, 'record_outbound', lambda host, status, seconds: recorded.append((host, status)))
+    server = FakeSearchServer().start()
+
+    async def run():
+        client = http_client.get_http_client()
+        try:
+            await client.get(server.url, params={'q' : 'punjab'})
+            server.stop()
+            try:
+                await client.get(server.url, params={'q' : 'punjab'}, headers={'Connection' : 'close'})
+            except httpx.TransportError:
+                pass
+        finally:
+            await http_client.close_http_client()
+
+    asyncio.run(run())
+    assert recorded == [('127.0.0.1', '200'), ('127.0.0.1', 'error')]
@@ -0,0 +1,151 @@
+import asyncio
+import httpx
+import pytest
+from functions import ingres_client
+from functions.ingres_client import CircuitBreaker, CircuitOpenError, RetryBudget, post_ingres
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    """Stands in for the shared httpx client; each post() pops the next outcome."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def post(self, url, json):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return httpx.Response(outcome, request=httpx.Request('POST', url))
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failures=2, reset=30, clock=FakeClock())
+    monkeypatch.setattr(ingres_client, 'breaker', breaker)
+    monkeypatch.setattr(ingres_client, 'budget', RetryBudget(ratio=0.5, maximum=2))
+    monkeypatch.setattr(ingres_client, '_backoff', lambda attempt: 0)
+    return breaker
+
+
+def use_client(monkeypatch, *outcomes) -> FakeClient:
+    client = FakeClient(outcomes)
+    monkeypatch.setattr(ingres_client, 'get_http_client', lambda: client)
+    return client
+
+
+def test_breaker_opens_after_consecutive_failures_and_rejects():
+    breaker = CircuitBreaker(failures=2, reset=30, clock=FakeClock())
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_breaker_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failures=2, reset=30, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_breaker_lets_one_probe_through_after_reset():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failures=1, reset=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_for_a_full_reset_period():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failures=1, reset=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_retry_budget_limits_retries_to_deposits():
+    budget = RetryBudget(ratio=0.5, maximum=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+    assert budget.stats() == {'tokens' : 0, 'retries' : 3, 'denied' : 2}
+
+
+def test_retry_budget_is_capped():
+    budget = RetryBudget(ratio=1, maximum=2)
+    for _ in range(5):
+        budget.deposit()
+    assert budget.stats()['tokens'] == 2
+
+
+def test_post_retries_transport_errors_then_succeeds(monkeypatch, breaker):
+    client = use_client(monkeypatch, httpx.ConnectError('down'), 503, 200)
+    response = asyncio.run(post_ingres('http://ingres', {}))
+    assert response.status_code == 200
+    assert client.calls == 3
+    assert breaker.stats()['consecutive_failures'] == 0
+
+
+def test_post_stops_retrying_when_budget_is_spent(monkeypatch, breaker):
+    ingres_client.budget.tokens = 0
+    client = use_client(monkeypatch, 503, 200)
+    response = asyncio.run(post_ingres('http://ingres', {}))
+    assert response.status_code == 503
+    assert client.calls == 1
+    assert breaker.stats()['consecutive_failures'] == 1
+
+
+def test_post_raises_without_calling_while_open(monkeypatch, breaker):
+    client = use_client(monkeypatch)
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(post_ingres('http://ingres', {}))
+    assert client.calls == 0
+
+
+@pytest.mark.parametrize('error', [httpx.DecodingError('bad body'), httpx.TooManyRedirects('loop'),
+                                   asyncio.CancelledError()])
+def test_unexpected_probe_error_does_not_wedge_the_breaker(monkeypatch, breaker, error):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.clock.now += 30
+    use_client(monkeypatch, error)
+    with pytest.raises(type(error)):
+        asyncio.run(post_ingres('http://ingres', {}))
+    assert breaker.state == 'open'
+
+    breaker.clock.now += 30
+    use_client(monkeypatch, 200)
+    assert asyncio.run(post_ingres('http://ingres', {})).status_code == 200
+    assert breaker.state == 'closed'
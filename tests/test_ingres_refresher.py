@@ -0,0 +1,30 @@
+import asyncio
+from functions.ingres_refresher import SnapshotRefresher, MAX_BACKOFF
+
+
+def test_backoff_is_capped_after_a_long_outage():
+    refresher = SnapshotRefresher(years=[], interval=30)
+    for failures, delay in ((0, 30), (1, 60), (2, 120), (5000, MAX_BACKOFF)):
+        refresher._status['consecutive_failures'] = failures
+        assert refresher._delay() == delay
+
+
+def test_unexpected_errors_do_not_end_the_loop(monkeypatch):
+    refresher = SnapshotRefresher(years=[], interval=0)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(refresher, 'refresh_due', failing)
+
+    async def run():
+        refresher.start()
+        await asyncio.sleep(0.05)
+        running = not refresher._task.done()
+        await refresher.stop()
+        return running
+
+    assert asyncio.run(run())
+    assert len(calls) > 1
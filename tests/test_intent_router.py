@@ -0,0 +1,41 @@
+import pytest
+from functions.history_store import MAX_YEAR
+from intent_router import classify
+
+
+@pytest.mark.parametrize('query, intent', [
+    ('How many over-exploited blocks are in Punjab?', 'block_classification'),
+    ('How many over-exploited blocks are there in Rajasthan?', 'block_classification'),
+    ('Block classification of Kerala in 2024', 'block_classification'),
+    ('Stage of extraction in Punjab', 'stage_of_extraction'),
+    ('Rainfall recharge of Kerala', 'rainfall_recharge'),
+])
+def test_single_metric_lookups_are_routed(query, intent):
+    matched, state, year, decision = classify(query)
+    assert decision == 'routed'
+    assert matched['name'] == intent
+
+
+@pytest.mark.parametrize('query', [
+    'Is groundwater in Punjab critical?',
+    'Is Punjab safe?',
+    'Punjab blockchain water records',
+    'Why is recharge falling in Punjab?',
+])
+def test_judgement_questions_go_to_the_agent(query):
+    matched, state, year, decision = classify(query)
+    assert matched is None
+
+
+@pytest.mark.parametrize('query, year', [
+    ('Stage of extraction in Punjab 2024-25', 2025),
+    ('Stage of extraction in Punjab 2023-2024', 2024),
+    ('Stage of extraction in Punjab for 2024', 2024),
+    ('Stage of extraction in Punjab', MAX_YEAR),
+])
+def test_assessment_year_spans_map_to_their_end_year(query, year):
+    assert classify(query)[2] == year
+
+
+def test_spans_that_are_not_one_assessment_year_go_to_the_agent():
+    assert classify('Stage of extraction in Punjab 2020-24')[3] == 'ambiguous_year'
@@ -0,0 +1,39 @@
+import asyncio
+import session_store
+import history_manager
+from history_manager import compact_history
+
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        return type('Response', (), {'content' : f'summary {len(self.prompts)}'})()
+
+
+def test_summary_prompts_stay_small_after_the_session_window_fills(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, 'SESSION_DB', tmp_path / 'sessions.sqlite3')
+    monkeypatch.setattr(session_store, 'SESSION_MAX_TURNS', 20)
+    monkeypatch.setattr(session_store, '_db', None)
+    monkeypatch.setattr(session_store, '_cache', session_store.LRUCache(maxsize=8))
+    summarizer = RecordingSummarizer()
+    monkeypatch.setattr(history_manager, '_summarizer', summarizer)
+    monkeypatch.setattr(history_manager, '_summaries', history_manager.TTLCache(maxsize=512, ttl=3600))
+
+    async def run():
+        session = session_store.new_session_id()
+        for i in range(40):
+            history = await session_store.load_history(session)
+            compacted = await compact_history(history, budget=400)
+            assert all('id' not in turn for turn in compacted)
+            await session_store.append_turns(session, [
+                {'role' : 'user', 'content' : f'Question {i} about recharge in district {i} ' * 4},
+                {'role' : 'assistant', 'content' : f'Answer {i} with numbers {i * 17} and {i * 31} ' * 4}])
+        assert len(await session_store.load_history(session)) == 20
+
+    asyncio.run(run())
+    late = [len(prompt) for prompt in summarizer.prompts[-10:]]
+    assert max(late) < 3 * min(len(prompt) for prompt in summarizer.prompts[:5])
+    assert all('Summary so far' in prompt for prompt in summarizer.prompts[-10:])
@@ -0,0 +1,25 @@
+import asyncio
+from bench.fake_ingres import synthetic_response
+from functions import get_subregiondata, location_tree
+from functions.ingres_cache import Snapshot
+
+
+def test_district_from_a_stale_response_carries_the_notice(monkeypatch):
+    states = Snapshot(synthetic_response('2024-2025'), 1, 'states')
+    districts = Snapshot(synthetic_response('2024-2025', names=['JAIPUR', 'JODHPUR']), 1, 'districts')
+    responses = {'COUNTRY' : states, 'STATE' : districts}
+
+    async def get_snapshot(payload, ttl=None):
+        return responses[payload.get('loctype', 'COUNTRY')]
+
+    monkeypatch.setattr(location_tree, 'get_snapshot', get_snapshot)
+    monkeypatch.setattr(get_subregiondata, 'is_supported_year', lambda year: True)
+
+    def lookup():
+        return asyncio.run(get_subregiondata.get_district_data.ainvoke(
+            {'state' : 'Rajasthan', 'district' : 'Jaipur', 'year' : 2025, 'metrics' : ['loss']}))
+
+    assert 'stale' not in lookup()
+    responses['STATE'] = districts.as_stale()
+    result = lookup()
+    assert result['success'] and result['stale'] is True
@@ -0,0 +1,26 @@
+import asyncio
+import httpx
+from functions import get_statecomparison
+
+
+def test_decorated_tool_keeps_its_schema():
+    schema = get_statecomparison.compare_states.args
+    assert {'metrics', 'states', 'year', 'sort_by', 'filter'} <= set(schema)
+    assert 'Compare one or more groundwater metrics' in get_statecomparison.compare_states.description
+
+
+def test_errors_become_failure_results(monkeypatch):
+    async def unreachable(year):
+        raise httpx.ConnectError('down')
+
+    monkeypatch.setattr(get_statecomparison, 'get_year_snapshot', unreachable)
+    monkeypatch.setattr(get_statecomparison, 'is_supported_year', lambda year: True)
+    result = asyncio.run(get_statecomparison.compare_states.ainvoke({'metrics' : ['loss']}))
+    assert result == {'success' : False, 'message' : 'Network error: down'}
+
+    async def timeout(year):
+        raise httpx.ReadTimeout('slow')
+
+    monkeypatch.setattr(get_statecomparison, 'get_year_snapshot', timeout)
+    result = asyncio.run(get_statecomparison.compare_states.ainvoke({'metrics' : ['loss']}))
+    assert result['message'] == 'API request timed out. Please try again.'
@@ -0,0 +1,28 @@
+import asyncio
+import tool_executor
+from tool_executor import tool_slot, tool_step
+
+
+def test_slots_are_bounded_per_step_not_per_process(monkeypatch):
+    monkeypatch.setattr(tool_executor, 'TOOL_CONCURRENCY', 2)
+    running = {'a' : 0, 'b' : 0, 'total' : 0}
+    peaks = {'a' : 0, 'b' : 0, 'total' : 0}
+
+    async def tool(step):
+        async with tool_slot():
+            for key in (step, 'total'):
+                running[key] += 1
+                peaks[key] = max(peaks[key], running[key])
+            await asyncio.sleep(0.01)
+            for key in (step, 'total'):
+                running[key] -= 1
+
+    async def step(name):
+        with tool_step():
+            await asyncio.gather(*[tool(name) for _ in range(4)])
+
+    async def run():
+        await asyncio.gather(step('a'), step('b'))
+
+    asyncio.run(run())
+    assert peaks == {'a' : 2, 'b' : 2, 'total' : 4}
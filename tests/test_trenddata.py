@@ -0,0 +1,14 @@
+import asyncio
+from bench.fake_ingres import synthetic_response
+from functions import get_trenddata
+from functions.history_store import HistoryStore, MAX_YEAR
+
+
+def test_end_year_is_clamped_to_the_known_years(monkeypatch):
+    store = HistoryStore({2023 : synthetic_response('2022-2023'), 2024 : synthetic_response('2023-2024')})
+    monkeypatch.setattr(get_trenddata, 'get_history_store', lambda: store)
+    result = asyncio.run(get_trenddata.get_groundwater_trend.ainvoke(
+        {'state' : 'Kerala', 'metric' : 'loss', 'start_year' : 2023, 'end_year' : 10 ** 9}))
+    assert result['success']
+    assert sorted(result['data']) == [2023, 2024]
+    assert max(result['missing_years']) == MAX_YEAR
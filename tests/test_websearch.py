@@ -0,0 +1,17 @@
+from bench.fake_search import synthetic_results
+from functions import websearch
+from functions.websearch import _clean
+
+
+def test_empty_snippets_are_skipped_not_treated_as_exhausted_budget():
+    results = _clean([{'snippet' : '', 'link' : 'https://a.example'}, {'snippet' : 'real text', 'link' : 'https://b.example'}])
+    assert [item['link'] for item in results] == ['https://b.example']
+
+
+def test_duplicates_are_dropped_and_total_budget_is_respected(monkeypatch):
+    monkeypatch.setattr(websearch, 'TOTAL_CHARS', 500)
+    results = _clean(synthetic_results('punjab groundwater'))
+    links = [item['link'] for item in results]
+    assert len(links) == len(set(links))
+    assert len({item['snippet'] for item in results}) == len(results)
+    assert sum(len(item['snippet']) for item in results) <= 500
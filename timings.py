@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from prometheus_client import Histogram
+from functions.location_index import ALIASES, STATE_NAMES, normalize_location
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRACE = os.getenv('AGENT_TRACE', '').lower() in ('1', 'true', 'yes')
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+STAGE_SECONDS = Histogram('neermitra_stage_seconds', 'Time spent in one stage of answering a request',
+                          ['stage', 'tool', 'state'], buckets=BUCKETS)
+OUTBOUND_SECONDS = Histogram('neermitra_outbound_http_seconds', 'Outbound HTTP request duration',
+                             ['host', 'status'], buckets=BUCKETS)
+REQUEST_SECONDS = Histogram('neermitra_request_seconds', 'Inbound request duration until the response starts',
+                            ['path', 'status'], buckets=BUCKETS)
+
+_known_states = set(STATE_NAMES)
+_lock = threading.Lock()
+_totals = defaultdict(float)
+_counts = defaultdict(int)
+
+
+def state_label(state) -> str:
+    """Canonical state name for metric labels; anything unrecognised collapses to `other`."""
+    if not state:
+        return ''
+    key = normalize_location(str(state))
+    key = ALIASES.get(key, key)
+    return key if key in _known_states else 'other'
+
+
+def _exemplar() -> dict | None:
+    request_id = request_id_var.get()
+    return {'request_id' : request_id} if request_id else None
+
+
+def record_stage(stage : str, seconds : float, tool : str = '', state : str = ''):
+    with _lock:
+        _totals[stage] += seconds
+        _counts[stage] += 1
+    state = state_label(state)
+    STAGE_SECONDS.labels(stage, tool, state).observe(seconds, exemplar=_exemplar())
+    if TRACE:
+        logger.info(json.dumps({'span' : stage, 'tool' : tool, 'state' : state,
+                                'ms' : round(seconds * 1000, 2), 'request_id' : request_id_var.get()}))
+
+
+def record_outbound(host : str, status : str, seconds : float):
+    OUTBOUND_SECONDS.labels(host, status).observe(seconds, exemplar=_exemplar())
+    if TRACE:
+        logger.info(json.dumps({'span' : 'outbound_http', 'host' : host, 'status' : status,
+                                'ms' : round(seconds * 1000, 2), 'request_id' : request_id_var.get()}))
+
+
+def record_request(path : str, status : int, seconds : float):
+    REQUEST_SECONDS.labels(path, str(status)).observe(seconds, exemplar=_exemplar())
+
+
+@contextmanager
+def stage_timer(stage : str, tool : str = '', state : str = ''):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started, tool, state)
+
+
+def get_stage_totals() -> dict[str, dict[str, float]]:
+    with _lock:
+        return {stage : {'seconds' : _totals[stage], 'count' : _counts[stage]} for stage in _totals}
+
+
+def reset_stages():
+    with _lock:
+        _totals.clear()
+        _counts.clear()
+
@@ -0,0 +1,63 @@
+import os
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager, asynccontextmanager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Limit per agent step, not per process: conversations never queue behind each other's tools.
+TOOL_CONCURRENCY = int(os.getenv('TOOL_CONCURRENCY', '8'))
+
+_step_slots = contextvars.ContextVar('tool_step_slots', default=None)
+_lock = threading.Lock()
+_stats = {'steps' : 0, 'parallel_steps' : 0, 'tool_calls' : 0, 'max_step_size' : 0,
+          'running' : 0, 'peak_running' : 0, 'queued' : 0}
+
+
+def record_step(actions : int):
+    """Count one agent step that asked for `actions` tool calls."""
+    with _lock:
+        _stats['steps'] += 1
+        _stats['tool_calls'] += actions
+        _stats['parallel_steps'] += actions > 1
+        _stats['max_step_size'] = max(_stats['max_step_size'], actions)
+
+
+@contextmanager
+def tool_step():
+    """Scope of one agent step; tool runs started inside it share that step's `TOOL_CONCURRENCY` slots."""
+    token = _step_slots.set(asyncio.Semaphore(TOOL_CONCURRENCY))
+    try:
+        yield
+    finally:
+        try:
+            _step_slots.reset(token)
+        except ValueError:
+            # Closed from another context (e.g. an abandoned generator); nothing left to restore.
+            pass
+
+
+@asynccontextmanager
+async def tool_slot():
+    """One of the current step's `TOOL_CONCURRENCY` slots, held while a tool run executes."""
+    slots = _step_slots.get() or asyncio.Semaphore(TOOL_CONCURRENCY)
+    with _lock:
+        _stats['queued'] += 1
+    async with slots:
+        with _lock:
+            _stats['queued'] -= 1
+            _stats['running'] += 1
+            _stats['peak_running'] = max(_stats['peak_running'], _stats['running'])
+        try:
+            yield
+        finally:
+            with _lock:
+                _stats['running'] -= 1
+
+
+def get_tool_stats() -> dict:
+    with _lock:
+        return {**_stats, 'concurrency' : TOOL_CONCURRENCY}